@@ -0,0 +1,264 @@
+# ================================================================
+# 🏁 Benchmark — offline, reproducible timing of the whole pipeline
+# ================================================================
+# python -m scripts.benchmark [--only micro|e2e] [--save] [--keep]
+#                             [--baseline FILE] [--tolerance PCT]
+#
+# Runs in a scratch directory with every network call stubbed: a fixed
+# fact list, canned TTS audio pre-seeded into the TTS cache and locally
+# generated backgrounds pre-seeded into the image pool. Compares the
+# result with the baseline JSON and exits 1 when any timing is more
+# than --tolerance percent slower; --save makes this run the baseline.
+# The scratch directory is removed afterwards unless --keep is given.
+import os, sys, json, math, time, shutil, argparse, tempfile, platform
+import statistics
+import numpy as np
+
+BASELINE  = os.environ.get('SHORTS_BENCH_BASELINE',
+                           'benchmark_baseline.json')
+TOLERANCE = float(os.environ.get('SHORTS_BENCH_TOLERANCE', 10))
+# Timings this small are mostly noise; never flag them
+NOISE_S   = 0.005
+
+FACTS = [
+    'Honey never spoils and edible honey was found in ancient tombs.',
+    'A group of flamingos is called a flamboyance.',
+    'Octopuses have three hearts and blue blood.',
+    'Bananas are berries but strawberries are not.',
+    'The Eiffel Tower can be fifteen centimetres taller in summer.',
+    'Wombat droppings are shaped like little cubes.',
+    'Sharks existed before trees appeared on Earth.',
+    'A day on Venus is longer than a year on Venus.',
+    'Scotland has more than four hundred words for snow.',
+    'Sea otters hold hands while they sleep so they do not drift.',
+    'The heart of a blue whale is as big as a small car.',
+    'Hot water can freeze faster than cold water.',
+    'There are more possible chess games than atoms in the universe.',
+    'Cows have best friends and get stressed when apart.',
+    'The shortest war in history lasted under forty minutes.',
+    'A bolt of lightning is five times hotter than the sun.',
+]
+SPEECH_S = 4.0      # every canned clip, so runs always total the same
+
+def _speech(dur, seed):
+    """Deterministic speech-like tone: voiced bursts, pitch wobble."""
+    from scripts.generate_short import SR
+    t   = np.arange(int(dur*SR), dtype=np.float32)/SR
+    f0  = 140 + 25*np.sin(2*np.pi*(0.7+seed*0.05)*t)
+    env = np.clip(np.sin(2*np.pi*3.2*t), 0, 1)**0.5
+    return (0.3*env*np.sin(2*np.pi*np.cumsum(f0)/SR)).astype(np.float32)
+
+def seed_tts_cache(facts):
+    """Stores post-processed canned speech for each fact, as gTTS would."""
+    from pydub import AudioSegment
+    from scripts.generate_short import np2seg
+    from scripts.tts_cache import TTSCache, cache_key
+    cache = TTSCache()
+    for i, f in enumerate(facts):
+        seg  = np2seg(_speech(SPEECH_S, i)).fade_in(250).fade_out(400)
+        seg += AudioSegment.silent(600)
+        cache.put(cache_key(f, 'en', 'gtts'), seg)
+
+def seed_image_pool(n, w, h):
+    """n smooth, seeded colour fields in the image pool."""
+    from PIL import Image, ImageFilter
+    from scripts.image_pool import ImagePool
+    pool = ImagePool()
+    rng  = np.random.RandomState(3)
+    for i in range(n):
+        small = rng.randint(0, 256, (8, 5, 3)).astype(np.uint8)
+        img   = Image.fromarray(small).resize((w, h), Image.BICUBIC)
+        img   = img.filter(ImageFilter.GaussianBlur(1.5))
+        img.save(pool.path(f'b{i}'), quality=92)
+        pool.add(f'b{i}', tuple(int(c) for c in small.mean((0, 1))))
+    pool.save()
+
+def stub_network():
+    """Fact API → FACTS in order; Unsplash → nothing; gTTS → error."""
+    import threading
+    from scripts import generate_short as gs, image_pool as ip
+    lock, it = threading.Lock(), iter(FACTS)
+
+    def fetch_fact(session, url=None):
+        with lock:
+            f = next(it, None)
+        if f is None:
+            raise RuntimeError('benchmark fact list exhausted')
+        return f
+
+    def no_tts(*a, **k):
+        raise RuntimeError('benchmark TTS cache miss')
+
+    gs.fetch_fact      = fetch_fact
+    gs.gTTS            = no_tts
+    ip.search_unsplash = lambda *a, **k: []
+
+def _time(fn, repeat):
+    """Median seconds of `repeat` calls, after one warm-up call."""
+    fn()
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter()-t0)
+    return statistics.median(runs)
+
+# ── Micro-benchmarks ──────────────────────────────────────────────
+def run_micro(repeat):
+    from scripts import generate_short as gs
+    from scripts.image_pool import ImagePool
+
+    pool   = ImagePool()
+    picked = pool.pick(math.ceil(gs.EST_TOTAL/4) + 3)
+    ipaths = [p for p, _ in picked]
+    dcols  = [c for _, c in picked]
+
+    facts   = FACTS[:11]
+    durs    = [SPEECH_S + 0.6]*len(facts)
+    wtimes  = [gs.get_word_timestamps(f.split(), d)
+               for f, d in zip(facts, durs)]
+    fstarts = [gs.HOOK_DUR + sum(durs[:i]) for i in range(len(durs))]
+    total   = gs.HOOK_DUR + sum(durs)
+    scene   = {'facts': facts, 'durs': durs, 'wtimes': wtimes,
+               'fstarts': fstarts, 'total': total,
+               'bg': (ipaths, dcols)}
+    out_dir = 'output/micro'
+    os.makedirs(f'{out_dir}/audio', exist_ok=True)
+    os.makedirs(f'{out_dir}/images', exist_ok=True)
+    for i, p in enumerate(ipaths):
+        shutil.copyfile(p, f'{out_dir}/images/bg{i}.jpg')
+
+    render = gs.make_renderer(scene)
+    bg     = gs.background_frames(ipaths, dcols)
+    clips  = [gs.seg2np(gs.np2seg(_speech(SPEECH_S, i)))
+              for i in range(len(facts))]
+    res = {
+        'render_hook':   _time(lambda: render(1.0), repeat),
+        'render_fact':   _time(lambda: render(fstarts[3]+1.0), repeat),
+        'render_outro':  _time(lambda: render(total-1.0), repeat),
+        'bg_still':      _time(lambda: bg(1.0), repeat),
+        'bg_crossfade':  _time(lambda: bg(3.75), repeat),
+        'mix_audio':     _time(lambda: gs.mix_audio(
+            clips, fstarts, total, out_dir), max(1, repeat//4)),
+        'thumbnail':     _time(lambda: gs.generate_thumbnail(
+            facts, ipaths, out_dir), max(1, repeat//4)),
+    }
+    return {k: round(v, 4) for k, v in res.items()}
+
+# ── End to end ────────────────────────────────────────────────────
+def run_e2e():
+    from scripts import generate_short as gs
+    t0 = time.perf_counter()
+    gs.generate(1)
+    wall = time.perf_counter()-t0
+    with open('output/video_1/timings.json') as f:
+        tm = json.load(f)
+    render = tm['stages']['render']['wall']
+    res = {'generate': round(wall, 3)}
+    res.update({f'stage_{k}': v['wall'] for k, v in tm['stages'].items()})
+    return res, {
+        'frames':        tm['frames']['count'],
+        'fps':           round(tm['frames']['count']/max(render, 1e-9), 2),
+        'frame_p95_ms':  tm['frames'].get('p95_ms'),
+    }
+
+def peak_rss():
+    import resource
+    mb = lambda who: round(resource.getrusage(who).ru_maxrss/1024, 1)
+    return {'self_mb': mb(resource.RUSAGE_SELF),
+            'children_mb': mb(resource.RUSAGE_CHILDREN)}
+
+def compare(cur, base, tolerance):
+    """Names of timings more than `tolerance` % slower than base."""
+    slow = []
+    for k, v in cur.items():
+        b = base.get(k)
+        if b is None or max(v, b) < NOISE_S:
+            continue
+        pct = (v-b)/b*100 if b else float('inf')
+        flag = '❌' if pct > tolerance else '  '
+        print(f'  {flag} {k:<18} {b:9.4f}s → {v:9.4f}s  {pct:+6.1f}%')
+        if pct > tolerance:
+            slow.append(k)
+    return slow
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(
+        description='Offline pipeline benchmark against a baseline')
+    ap.add_argument('--only', choices=['micro', 'e2e'])
+    ap.add_argument('--repeat', type=int, default=8,
+                    help='calls per micro-benchmark (median reported)')
+    ap.add_argument('--baseline', default=BASELINE)
+    ap.add_argument('--tolerance', type=float, default=TOLERANCE,
+                    help='allowed slowdown in percent')
+    ap.add_argument('--save', action='store_true',
+                    help='store this run as the baseline')
+    ap.add_argument('--keep', action='store_true',
+                    help="keep the temp work dir (caches, videos)")
+    args = ap.parse_args(argv)
+    baseline = os.path.abspath(args.baseline)
+
+    work = tempfile.mkdtemp(prefix='shorts-bench-')
+    cwd  = os.getcwd()
+    try:
+        os.environ.update({
+            'SHORTS_TTS_CACHE':   f'{work}/.cache/tts',
+            'SHORTS_IMAGE_POOL':  f'{work}/.cache/images',
+            'SHORTS_IMAGE_TOPUP': '0',
+            'UNSPLASH_KEY':       '',
+        })
+        # scripts/ must stay importable (here and in spawned workers)
+        sys.path.insert(0, os.path.dirname(
+            os.path.dirname(os.path.abspath(__file__))))
+        os.chdir(work)
+        # Only now: the cache/pool locations are read at import time
+        from scripts import generate_short as gs
+        seed_tts_cache(FACTS)
+        seed_image_pool(math.ceil(gs.EST_TOTAL/4) + 3, gs.W, gs.H)
+        stub_network()
+
+        timings, info = {}, {}
+        if args.only != 'e2e':
+            timings.update(run_micro(args.repeat))
+        if args.only != 'micro':
+            e2e, info = run_e2e()
+            timings.update(e2e)
+
+        result = {
+            'timings': timings, **info, 'peak_rss': peak_rss(),
+            'config': {'python': platform.python_version(),
+                       'cpus': os.cpu_count(), 'encoder': gs.ENCODER,
+                       'render_workers': gs.RENDER_WORKERS,
+                       'single_pass': gs.SINGLE_PASS,
+                       'frame_memo': gs.FRAME_MEMO and gs.MOTION_FPS},
+        }
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f'📂 Kept {work}')
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+    print(json.dumps(result, indent=2))
+
+    if args.save:
+        with open(baseline, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f'💾 Baseline → {baseline}')
+        return 0
+    if not os.path.exists(baseline):
+        print(f'⚠️  No baseline at {baseline}; run with --save first')
+        return 0
+    with open(baseline) as f:
+        base = json.load(f)
+    if base.get('config') != result['config']:
+        print(f"⚠️  Baseline config differs: {base.get('config')}")
+    print(f'Against {baseline} (tolerance {args.tolerance:.0f}%):')
+    slow = compare(timings, base['timings'], args.tolerance)
+    if slow:
+        print(f'❌ Slower than baseline: {", ".join(slow)}')
+        return 1
+    print('✅ Within tolerance')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# ================================================================
+# 📌 Checkpoint — per-video stage manifest so a failed run resumes
+# ================================================================
+import os, json, hashlib, logging
+
+log = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+
+def _fingerprint(path):
+    """Size + mtime: enough to tell a file was rewritten or truncated."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def _hash(obj):
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str)
+                          .encode()).hexdigest()[:16]
+
+class Checkpoint:
+    """
+    out_dir/manifest.json: for every finished stage, a hash of its
+    inputs, its result (as JSON) and fingerprints of the files it
+    wrote. A stage's inputs are `config` plus its dependencies'
+    outputs, so re-running one stage invalidates everything after it.
+
+    A stage is restored only if its inputs hash matches and every file
+    it recorded is still there, unchanged. Stages named in `rerun` are
+    never restored.
+    """
+    def __init__(self, out_dir, config=None, rerun=()):
+        self.path   = os.path.join(out_dir, MANIFEST)
+        self.config = config or {}
+        self.rerun  = set(rerun)
+        self.stages = {}
+        try:
+            with open(self.path) as f:
+                self.stages = json.load(f).get('stages', {})
+        except (OSError, ValueError):
+            pass
+
+    def key(self, name, deps):
+        """Inputs hash of stage `name` given its dependencies' names."""
+        return _hash({'stage': name, 'config': self.config,
+                      'deps': {d: self.stages[d]['out'] for d in deps}})
+
+    def restore(self, name, key):
+        """(True, result) when `name` can be skipped, else (False, None)."""
+        e = self.stages.get(name)
+        if name in self.rerun or not e or e['key'] != key:
+            return False, None
+        if any(_fingerprint(p) != fp for p, fp in e['files'].items()):
+            return False, None
+        return True, e['value']
+
+    def forget(self, name):
+        """Drops `name` before it runs, so a crash can't leave it valid."""
+        if self.stages.pop(name, None):
+            self._write()
+
+    def record(self, name, key, value, files):
+        files = {p: _fingerprint(p) for p in files}
+        self.stages[name] = {'key': key, 'value': value, 'files': files,
+                             'out': _hash([value, files])}
+        self._write()
+
+    def _write(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'stages': self.stages}, f, indent=2)
+        os.replace(tmp, self.path)
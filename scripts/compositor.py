@@ -0,0 +1,141 @@
+# ================================================================
+# 🧩 Compositor — uint8 fixed-point alpha blending for render_video
+# ================================================================
+import sys, time
+import numpy as np
+from PIL import Image, ImageDraw
+
+def blend_float(bg, ov):
+    """Reference float32 blend — what render_video used to do."""
+    ov  = np.array(ov)
+    alp = ov[:,:,3:4].astype(np.float32)/255.0
+    return (bg.astype(np.float32)*(1-alp) +
+            ov[:,:,:3].astype(np.float32)*alp).astype(np.uint8)
+
+def merge_boxes(boxes, w, h):
+    """
+    Clips (x0,y0,x1,y1) boxes to the frame and merges overlapping ones,
+    so no pixel is blended twice.
+    """
+    out = []
+    for x0, y0, x1, y1 in boxes:
+        box = [max(x0,0), max(y0,0), min(x1,w), min(y1,h)]
+        if box[0] >= box[2] or box[1] >= box[3]:
+            continue
+        merged = True
+        while merged:
+            merged = False
+            for o in out:
+                if (o[0] < box[2] and box[0] < o[2] and
+                        o[1] < box[3] and box[1] < o[3]):
+                    out.remove(o)
+                    box = [min(o[0],box[0]), min(o[1],box[1]),
+                           max(o[2],box[2]), max(o[3],box[3])]
+                    merged = True
+                    break
+        out.append(box)
+    return [tuple(b) for b in out]
+
+class Compositor:
+    """
+    Blends an RGBA overlay onto an RGB uint8 frame in place.
+
+    Only the given boxes (or the overlay's alpha bounding box) are
+    touched, and all math is integer: out = (bg*(255-a) + ov*a) // 255,
+    on uint16 scratch buffers that are allocated once and reused for
+    every frame. Matches blend_float() to within ±1.
+    """
+    def __init__(self, w, h):
+        self.acc = np.empty(w*h*3, np.uint16)
+        self.tmp = np.empty(w*h*3, np.uint16)
+
+    def over(self, bg, ov, boxes=None):
+        """
+        bg: uint8 (H,W,3), modified and returned. ov: PIL RGBA image of
+        the same size. `boxes` must not overlap (see merge_boxes); when
+        omitted the overlay's alpha bbox is scanned for.
+        """
+        if boxes is None:
+            box   = ov.getchannel('A').getbbox()
+            boxes = [box] if box else []
+        return self.over_layers(bg, self.layers(ov, boxes))
+
+    def layers(self, ov, boxes):
+        """
+        Snapshots the overlay's boxes as (box, rgb, alpha) planes, so
+        the same overlay can be blended onto many frames (over_layers)
+        after `ov` itself has been cleared.
+        """
+        out = []
+        for box in boxes:
+            # Let PIL de-interleave in C so every numpy op in _blend
+            # runs over contiguous (h,w,3) uint8 planes instead of
+            # strided RGBA views.
+            r, g, b, a = ov.crop(box).split()
+            out.append((box, np.asarray(Image.merge('RGB', (r, g, b))),
+                        np.asarray(Image.merge('RGB', (a, a, a)))))
+        return out
+
+    def over_layers(self, bg, layers):
+        for box, src, alp in layers:
+            self._blend(bg, box, src, alp)
+        return bg
+
+    def _blend(self, bg, box, src, alp):
+        x0, y0, x1, y1 = box
+        h, w = y1-y0, x1-x0
+        dst  = bg[y0:y1, x0:x1]
+        acc  = self.acc[:h*w*3].reshape(h, w, 3)
+        tmp  = self.tmp[:h*w*3].reshape(h, w, 3)
+
+        np.multiply(src, alp, out=acc, dtype=np.uint16)
+        np.subtract(255, alp, out=tmp, dtype=np.uint16)
+        tmp *= dst
+        acc += tmp
+        # x // 255 for 0 <= x <= 255*255 without a division
+        acc += 1
+        np.right_shift(acc, 8, out=tmp)
+        acc += tmp
+        acc >>= 8
+        np.copyto(dst, acc, casting='unsafe')
+
+# ── Micro-benchmark: python -m scripts.compositor [frames] ────────
+def _sample_overlay(w, h):
+    """Roughly a mid-fact frame: card, banner, particles, dots, bar."""
+    cv = Image.new('RGBA', (w, h), (0,0,0,0))
+    dr = ImageDraw.Draw(cv)
+    rng = np.random.RandomState(0)
+    for x, y in zip(rng.uniform(0, w, 28), rng.uniform(0, h, 28)):
+        dr.ellipse([x-5,y-5,x+5,y+5], fill=(255,255,210,80))
+    dr.rounded_rectangle([40,h//2-200,w-40,h//2+200], radius=28,
+                         fill=(10,10,30,195))
+    dr.text((w//2,52), 'Did You Know?', fill=(255,255,255,140))
+    dr.ellipse([w//2-9,h-94,w//2+9,h-76], fill=(255,220,0,230))
+    dr.rounded_rectangle([50,h-50,w//2,h-40], radius=5,
+                         fill=(255,220,0,200))
+    return cv
+
+def benchmark(frames=60, w=1080, h=1920):
+    rng = np.random.RandomState(1)
+    bg  = rng.randint(0, 256, (h, w, 3)).astype(np.uint8)
+    ov  = _sample_overlay(w, h)
+    cmp = Compositor(w, h)
+
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        ref = blend_float(bg.copy(), ov)
+    before = (time.perf_counter()-t0)/frames*1000
+
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        out = cmp.over(bg.copy(), ov)
+    after = (time.perf_counter()-t0)/frames*1000
+
+    diff = int(np.abs(ref.astype(np.int16)-out.astype(np.int16)).max())
+    return {'float_ms': before, 'fixed_ms': after, 'max_diff': diff}
+
+if __name__ == '__main__':
+    r = benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
+    print(f"float32 blend : {r['float_ms']:7.2f} ms/frame")
+    print(f"uint8 blend   : {r['fixed_ms']:7.2f} ms/frame")
+    print(f"max |diff|    : {r['max_diff']}")
@@ -0,0 +1,109 @@
+# ================================================================
+# 🎞️ Encoder — raw frames piped straight into ffmpeg
+# ================================================================
+import os, subprocess, tempfile
+from moviepy.config import get_setting
+
+# 'ffmpeg' pipes rawvideo into ffmpeg; 'moviepy' keeps write_videofile.
+ENCODER = os.environ.get('SHORTS_ENCODER', 'ffmpeg')
+
+# x264 settings — CRF wins over bitrate when both are set.
+X264 = {
+    'preset':  os.environ.get('SHORTS_X264_PRESET', 'medium'),
+    'crf':     os.environ.get('SHORTS_X264_CRF', ''),
+    'bitrate': os.environ.get('SHORTS_X264_BITRATE', '5000k'),
+    'threads': os.environ.get('SHORTS_X264_THREADS', ''),
+}
+
+def x264_args(preset=None, crf=None, bitrate=None, threads=None):
+    """ffmpeg output args for H.264; unset arguments fall back to X264."""
+    preset  = preset  or X264['preset']
+    crf     = crf     or X264['crf']
+    bitrate = bitrate or X264['bitrate']
+    threads = threads or X264['threads']
+    args = ['-c:v', 'libx264', '-preset', preset, '-pix_fmt', 'yuv420p']
+    args += ['-crf', str(crf)] if crf else ['-b:v', bitrate]
+    if threads:
+        args += ['-threads', str(threads)]
+    return args
+
+def ffmpeg_bin():
+    return get_setting('FFMPEG_BINARY')
+
+class FFmpegPipe:
+    """
+    Streams uint8 (H,W,3) frames into ffmpeg's stdin as rawvideo.
+
+    Frames are written from their own buffer, no intermediate copy, so
+    they must be C-contiguous. `audio` is muxed in as AAC in the same
+    pass; the output gets +faststart so the moov atom leads the file and
+    an upload can start reading it immediately.
+    """
+    def __init__(self, path, size, fps, audio=None, faststart=True,
+                 **x264):
+        w, h = size
+        cmd  = [ffmpeg_bin(), '-y', '-loglevel', 'error',
+                '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                '-s', f'{w}x{h}', '-r', str(fps), '-i', '-']
+        if audio:
+            cmd += ['-i', audio, '-map', '0:v', '-map', '1:a',
+                    '-c:a', 'aac']
+        cmd += x264_args(**x264)
+        if faststart:
+            cmd += ['-movflags', '+faststart']
+        cmd.append(path)
+        self.path  = path
+        self.frame = w*h*3
+        # A file, not a pipe: nobody reads stderr until close(), and a
+        # full pipe would block ffmpeg (and so our writes) mid-encode
+        self.err   = tempfile.TemporaryFile()
+        self.proc  = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                      stderr=self.err)
+
+    def write(self, frame):
+        if frame.nbytes != self.frame or not frame.flags.c_contiguous:
+            raise ValueError(
+                f'Expected a contiguous {self.frame}-byte rgb24 frame')
+        try:
+            self.proc.stdin.write(memoryview(frame).cast('B'))
+        except BrokenPipeError:
+            self.close()
+            raise
+
+    def close(self):
+        """Finishes the encode; safe to call again (no-op then)."""
+        if self.err.closed:
+            return
+        if self.proc.stdin and not self.proc.stdin.closed:
+            self.proc.stdin.close()
+        code = self.proc.wait()
+        self.err.seek(0)
+        err = self.err.read().decode(errors='replace')
+        self.err.close()
+        if code != 0:
+            raise IOError(f'ffmpeg failed writing {self.path}:\n{err}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def concat_segments(paths, audio, out_path, faststart=True):
+    """Joins same-codec segments without re-encoding and muxes `audio`."""
+    lst = f'{out_path}.segments.txt'
+    with open(lst, 'w') as f:
+        f.writelines(f"file '{os.path.abspath(p)}'\n" for p in paths)
+    cmd = [ffmpeg_bin(), '-y', '-loglevel', 'error',
+           '-f', 'concat', '-safe', '0', '-i', lst]
+    if audio:
+        cmd += ['-i', audio, '-map', '0:v', '-map', '1:a',
+                '-c:a', 'aac']
+    cmd += ['-c:v', 'copy']
+    if faststart:
+        cmd += ['-movflags', '+faststart']
+    cmd.append(out_path)
+    try:
+        subprocess.run(cmd, check=True)
+    finally:
+        os.remove(lst)
@@ -0,0 +1,261 @@
+# ================================================================
+# 📚 Facts store — used facts as an append-only log + sorted index
+# ================================================================
+import os, json, mmap, zlib, hashlib, logging, threading, unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from math import comb
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# All committed back by .github/workflows/daily_shorts.yml. New facts
+# are appended to the log; compaction merges it into the indexes,
+# sorted files of fixed-width records that are searched in place.
+FACTS_INDEX = os.environ.get('SHORTS_FACTS_INDEX', 'used_facts.idx')
+FACTS_LSH   = os.environ.get('SHORTS_FACTS_LSH',   'used_facts.lsh')
+FACTS_LOG   = os.environ.get('SHORTS_FACTS_LOG',   'used_facts.log')
+COMPACT_AT  = int(os.environ.get('SHORTS_FACTS_COMPACT_AT', 2000))
+LEGACY_JSON = 'used_facts.json'
+# Estimated Jaccard similarity (of 5-character shingles) from which a
+# fact counts as a repeat of one already used; 1 = exact repeats only.
+NEAR_DUP    = float(os.environ.get('SHORTS_NEAR_DUP', 0.7))
+
+HASH_LEN = 16
+REC      = HASH_LEN + 1     # record + '\n'
+
+def normalise(text):
+    """Case-folded letters and digits only: spacing/punctuation ignored."""
+    return ''.join(c for c in unicodedata.normalize('NFKC', text)
+                   .casefold() if c.isalnum())
+
+def fact_hash(text):
+    return hashlib.sha1(normalise(text).encode()).hexdigest()[:HASH_LEN]
+
+# ── MinHash / LSH ─────────────────────────────────────────────────
+# The geometry is fixed, since the band keys of every used fact are
+# stored; the threshold only sets how many bands must match.
+SHINGLE, BANDS, ROWS = 5, 16, 4
+_PRIME = 4294967311                 # > 2**32, so a*x+b fits in uint64
+_rs    = np.random.RandomState(20)
+_A     = _rs.randint(1, 2**32, BANDS*ROWS, dtype=np.uint64)
+_B     = _rs.randint(0, 2**32, BANDS*ROWS, dtype=np.uint64)
+
+def minhash(text):
+    """BANDS*ROWS MinHash values of the normalised text's shingles."""
+    s  = normalise(text)
+    sh = {s[i:i+SHINGLE] for i in range(max(1, len(s)-SHINGLE+1))}
+    x  = np.array([zlib.crc32(g.encode()) for g in sh], np.uint64)
+    return ((_A[:,None]*x[None,:] + _B[:,None]) % _PRIME).min(axis=1)
+
+def band_keys(text):
+    """One 8-hex key per band: band number + hash of its rows."""
+    sig = minhash(text)
+    return [f'{b:x}{zlib.crc32(sig[b*ROWS:(b+1)*ROWS].tobytes()) >> 4:07x}'
+            for b in range(BANDS)]
+
+def bands_needed(threshold):
+    """
+    Matching bands for a near-duplicate: the count at which a pair of
+    exactly `threshold` similarity is caught half the time.
+    """
+    def p_at_least(m):
+        p = threshold**ROWS
+        return sum(comb(BANDS, k) * p**k * (1-p)**(BANDS-k)
+                   for k in range(m, BANDS+1))
+    if threshold >= 1:
+        return BANDS + 1            # never: exact matches only
+    return min(range(1, BANDS+1), key=lambda m: abs(p_at_least(m)-0.5))
+
+def _merge(old, new):
+    """Merges two sorted iterables of records."""
+    out, i = [], 0
+    for r in old:
+        while i < len(new) and new[i] < r:
+            out.append(new[i]); i += 1
+        out.append(r)
+    out.extend(new[i:])
+    return out
+
+class _Index:
+    """Read-only view of a sorted index file, bisected through mmap."""
+    def __init__(self, path):
+        self.f, self.mm, self.n = None, None, 0
+        if os.path.exists(path) and os.path.getsize(path):
+            self.f  = open(path, 'rb')
+            self.mm = mmap.mmap(self.f.fileno(), 0,
+                                access=mmap.ACCESS_READ)
+            self.n  = len(self.mm)//REC
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return self.mm[i*REC:i*REC+HASH_LEN].decode()
+
+    def __contains__(self, h):
+        i = bisect_left(self, h, 0, self.n)
+        return i < self.n and self[i] == h
+
+    def __iter__(self):
+        return (self[i] for i in range(self.n))
+
+    def prefixed(self, prefix):
+        """Every record starting with `prefix`, in order."""
+        i = bisect_left(self, prefix, 0, self.n)
+        while i < self.n and self[i].startswith(prefix):
+            yield self[i]
+            i += 1
+
+    def close(self):
+        if self.mm:
+            self.mm.close()
+            self.f.close()
+
+class UsedFacts:
+    """
+    Every fact ever used, by hash of its normalised text plus the LSH
+    band keys of its MinHash. Lookups bisect the indexes and check the
+    small unsorted log tail, and a save appends only the new facts, so
+    a run's cost follows the facts it adds, not the size of the history.
+
+    Shared by every video made in this process: claim() reserves a
+    fact so concurrent videos never pick the same one (or a near
+    duplicate of it); unused claims are released and the rest
+    committed, then appended by save().
+    """
+    def __init__(self, index=FACTS_INDEX, log_path=FACTS_LOG,
+                 lsh=FACTS_LSH, threshold=NEAR_DUP):
+        self.index_path = index
+        self.lsh_path   = lsh
+        self.log_path   = log_path
+        self.need       = bands_needed(threshold)
+        self.lock       = threading.Lock()
+        self.claimed    = {}        # hash -> band keys
+        self.unsaved    = {}
+        # band key -> fact ids, for facts not in the LSH index yet
+        self.mem        = defaultdict(set)
+        self._migrate()
+        self.index = _Index(index)
+        self.lsh   = _Index(lsh)
+        self.tail  = {}
+        if os.path.exists(log_path):
+            with open(log_path, encoding='utf-8') as f:
+                for line in f:
+                    h, _, text = line.rstrip('\n').partition('\t')
+                    if len(h) == HASH_LEN:
+                        self.tail[h] = text
+                        self._remember(h, band_keys(text))
+
+    def _migrate(self):
+        """One-off: used_facts.json (list of keys) → index files."""
+        if os.path.exists(self.index_path) or \
+                not os.path.exists(LEGACY_JSON):
+            return
+        try:
+            with open(LEGACY_JSON) as f:
+                keys = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Old keys were lower-cased with spaces removed, which
+        # normalise() maps to the same string as the original text
+        self._write(self.index_path, sorted({fact_hash(k) for k in keys}))
+        self._write(self.lsh_path, sorted(
+            {f'{b}{fact_hash(k)[:8]}' for k in keys for b in band_keys(k)}))
+        os.remove(LEGACY_JSON)
+        log.info(f'📚 Migrated {len(keys)} facts → {self.index_path}')
+
+    @staticmethod
+    def _write(path, records):
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.writelines(f'{r}\n' for r in records)
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return len(self.index) + len(self.tail) + len(self.unsaved)
+
+    def _used(self, h):
+        return h in self.tail or h in self.unsaved or h in self.index
+
+    def _remember(self, h, keys):
+        for k in keys:
+            self.mem[k].add(h[:8])
+
+    def _near(self, keys):
+        """Whether some known fact shares at least `need` bands."""
+        hits = Counter()
+        for k in keys:
+            hits.update(self.mem.get(k, set()) |
+                        {r[8:] for r in self.lsh.prefixed(k)})
+        return bool(hits) and max(hits.values()) >= self.need
+
+    def claim(self, text):
+        """
+        True if neither `text` nor a near duplicate of it was ever used
+        or claimed, and claims it.
+        """
+        h    = fact_hash(text)
+        keys = band_keys(text)
+        with self.lock:
+            if h in self.claimed or self._used(h):
+                return False
+            if self._near(keys):
+                log.info(f'  ≈ Near-duplicate skipped: {text[:60]}')
+                return False
+            self.claimed[h] = keys
+            self._remember(h, keys)
+            return True
+
+    def release(self, texts):
+        with self.lock:
+            for t in texts:
+                h = fact_hash(t)
+                for k in self.claimed.pop(h, ()):
+                    self.mem[k].discard(h[:8])
+
+    def commit(self, texts):
+        with self.lock:
+            for t in texts:
+                h = fact_hash(t)
+                self.claimed.pop(h, None)
+                self.unsaved[h] = ' '.join(t.split())
+
+    def save(self):
+        """Appends committed facts to the log; compacts when it's long."""
+        with self.lock:
+            if self.unsaved:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.writelines(f'{h}\t{t}\n'
+                                 for h, t in self.unsaved.items())
+                n = len(self.unsaved)
+                self.tail.update(self.unsaved)
+                self.unsaved = {}
+                log.info(f'💾 Saved {n} new used facts '
+                         f'({len(self)} total) → {self.log_path}')
+            if len(self.tail) >= COMPACT_AT:
+                self._compact()
+
+    def compact(self):
+        with self.lock:
+            self._compact()
+
+    def _compact(self):
+        """Merges the log into the indexes and empties the log."""
+        new  = sorted(h for h in self.tail if h not in self.index)
+        recs = sorted({f'{k}{h[:8]}' for h, t in self.tail.items()
+                       for k in band_keys(t)})
+        for attr, path, add in [('index', self.index_path, new),
+                                ('lsh',   self.lsh_path,   recs)]:
+            old    = getattr(self, attr)
+            merged = _merge(old, add)
+            old.close()
+            self._write(path, merged)
+            setattr(self, attr, _Index(path))
+        open(self.log_path, 'w').close()
+        self.tail = {}
+        # Only facts still being claimed aren't in the LSH index now
+        self.mem  = defaultdict(set)
+        for h, keys in self.claimed.items():
+            self._remember(h, keys)
+        log.info(f'🗜️  Compacted used facts: {len(self.index)} in index')
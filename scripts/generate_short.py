@@ -1,7 +1,8 @@
 # ================================================================
 # 🎬 YouTube Shorts — Hook + No Duplicates + Thumbnail
 # ================================================================
-import os, sys, math, time, io, textwrap, random, logging, json
+import os, sys, math, time, textwrap, random, logging, json, glob
+import shutil, threading, functools, hashlib
 import numpy as np
 import requests
 from gtts import gTTS
@@ -9,6 +10,16 @@ from pydub import AudioSegment
 from PIL import Image, ImageDraw, ImageFont, ImageFilter, ImageEnhance
 from moviepy.editor import VideoClip, VideoFileClip, AudioFileClip
 from moviepy.config import change_settings
+from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+from scripts.compositor import Compositor, merge_boxes
+from scripts.encoder import ENCODER, X264, FFmpegPipe, concat_segments
+from scripts.tts_cache import TTSCache, cache_key
+from scripts.facts_store import UsedFacts
+from scripts.image_pool import (ImagePool, TOPUP, TOPUP_WAIT,
+                                DL_WORKERS, http_session, start_top_up)
+from scripts.pipeline import Stage, run_graph, process_pool
+from scripts.checkpoint import Checkpoint
+from scripts.timing import PROFILE, FrameStats, report_for, write_report
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
 log = logging.getLogger(__name__)
@@ -16,24 +27,9 @@ log = logging.getLogger(__name__)
 change_settings({'IMAGEMAGICK_BINARY': '/usr/bin/convert'})
 
 W, H, FPS, SR  = 1080, 1920, 30, 44100
-USED_FACTS_FILE = 'used_facts.json'
-
-# ── Used-facts store ──────────────────────────────────────────────
-def load_used_facts():
-    if os.path.exists(USED_FACTS_FILE):
-        try:
-            with open(USED_FACTS_FILE) as f:
-                return set(json.load(f))
-        except Exception:
-            return set()
-    return set()
-
-def save_used_facts(used):
-    with open(USED_FACTS_FILE, 'w') as f:
-        json.dump(sorted(list(used)), f, indent=2)
-    log.info(f'💾 Saved {len(used)} used facts → {USED_FACTS_FILE}')
 
 # ── Fonts ─────────────────────────────────────────────────────────
+@functools.lru_cache(maxsize=None)
 def load_font(sz):
     for fp in [
         '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
@@ -59,12 +55,18 @@ def textw(font, s):
         except: return len(s) * 32
 
 # ── Audio helpers ─────────────────────────────────────────────────
+# Audio is float32 mono at SR in [-1, 1] in memory and 16-bit WAV on
+# disk; the only lossy encode is AAC when the video is muxed.
 def np2seg(a):
     a = np.clip(a, -1, 1)
     return AudioSegment(
         (a * 32767).astype(np.int16).tobytes(),
         frame_rate=SR, sample_width=2, channels=1)
 
+def seg2np(seg):
+    seg = seg.set_frame_rate(SR).set_channels(1).set_sample_width(2)
+    return np.frombuffer(seg.raw_data, np.int16).astype(np.float32)/32768
+
 def gen_music(dur):
     t = np.linspace(0, dur, int(dur*SR), dtype=np.float32)
     s = sum(0.08*np.sin(2*np.pi*f*t) + 0.025*np.sin(4*np.pi*f*t)
@@ -74,18 +76,20 @@ def gen_music(dur):
     s[:fi]  *= np.linspace(0, 1, fi)
     s[-fi:] *= np.linspace(1, 0, fi)
     mx = np.max(np.abs(s))
-    return np2seg(s/mx*0.18 if mx > 0 else s)
+    return s/mx*0.18 if mx > 0 else s
 
+@functools.lru_cache(maxsize=None)
 def gen_ding():
     t = np.linspace(0, 0.5, int(0.5*SR), dtype=np.float32)
-    return np2seg(np.sin(2*np.pi*880*t)*np.exp(-7*t)*0.45)
+    return np.sin(2*np.pi*880*t)*np.exp(-7*t)*0.45
 
+@functools.lru_cache(maxsize=None)
 def gen_whoosh():
     """Short rising sound for hook transition."""
     t = np.linspace(0, 0.4, int(0.4*SR), dtype=np.float32)
     freq = 200 + 800 * (t / 0.4)
     s    = np.sin(2*np.pi*freq*t) * np.linspace(0, 1, len(t)) * 0.3
-    return np2seg(s)
+    return s.astype(np.float32)
 
 def get_word_timestamps(words, dur):
     lead  = 0.15
@@ -107,137 +111,237 @@ def get_word_timestamps(words, dur):
 # ── 1. Fetch unique facts + audio ─────────────────────────────────
 HOOK_DUR = 2.0    # 2-second hook at start before facts
 
-def fetch_and_generate(out_dir):
+FACTS_URL     = 'https://uselessfacts.jsph.pl/random.json?language=en'
+# Concurrent fact fetches and, separately, concurrent TTS syntheses.
+FETCH_WORKERS = int(os.environ.get('SHORTS_FETCH_WORKERS', 4))
+# After a failed or rejected (already used) fetch, new fetches wait 1s,
+# doubling per miss in a row up to 8s: the 60-miss budget outlasts a
+# short outage of the facts API, and a store that has seen everything
+# it serves isn't hammered.
+FETCH_BACKOFF, FETCH_BACKOFF_MAX = 1.0, 8.0
+
+def gtts_save(text, path):
+    gTTS(text=text, lang='en').save(path)
+
+def fetch_fact(session, url=FACTS_URL):
+    return session.get(url, timeout=8).json().get('text','').strip()
+
+def synth_fact(fact, path, tts=gtts_save, cache=None, engine='gtts',
+               net=None):
+    """
+    Faded + padded speech for `fact`, from the TTS cache if present.
+    `net(kind, secs)` is told how long the TTS call took.
+    """
+    key = cache and cache_key(fact, 'en', engine)
+    hit = cache and cache.get(key)
+    if hit:
+        try:
+            return AudioSegment.from_wav(hit)
+        except OSError:     # evicted by another video meanwhile
+            pass
+    t0 = time.perf_counter()
+    tts(fact, path)
+    if net:
+        net('tts', time.perf_counter()-t0)
+    seg = AudioSegment.from_mp3(path).fade_in(250).fade_out(400)
+    seg += AudioSegment.silent(600)
+    if cache:
+        cache.put(key, seg)
+    return seg
+
+def fetch_and_generate(out_dir, facts_url=FACTS_URL, tts=gtts_save,
+                       workers=FETCH_WORKERS, engine='gtts',
+                       cache=None, used=None, session=None):
+    """
+    Fetches facts and their speech concurrently: a pool of fetchers
+    produces candidates (claimed in the used-facts store, so never a
+    fact, or a near duplicate of one, used before or by another video
+    in flight, and rejected before any TTS), new ones go to a
+    pool of TTS workers, and finished audio is accepted strictly in
+    fetch order until the 50–60s budget is met. Work still in flight
+    at that point is cancelled.
+
+    `facts_url` and `tts(text, path)` can point at local stubs; pass a
+    distinct `engine` name with a custom tts so its cache entries don't
+    mix with gTTS ones. `used` and `session` are shared in batch mode.
+    """
+    from concurrent.futures import (ThreadPoolExecutor, wait,
+                                    FIRST_COMPLETED)
     os.makedirs(f'{out_dir}/audio',  exist_ok=True)
     os.makedirs(f'{out_dir}/images', exist_ok=True)
 
-    used_ever     = load_used_facts()
-    seen_this_run = set()
-    log.info(f'📚 {len(used_ever)} facts already used — skipping')
+    used    = UsedFacts() if used is None else used
+    claimed = set()
+    log.info(f'📚 {len(used)} facts already used — skipping')
+    cache = cache or TTSCache()
+    rep   = report_for(out_dir)
 
-    facts, apaths, durs, wtimes = [], [], [], []
+    facts, clips, durs, wtimes = [], [], [], []
     total, fails = 0.0, 0
 
-    # Target: 50-60s of facts (hook adds 2s on top)
-    while total < 50 and fails < 60:
+    own_session = session is None
+    session     = session or requests.Session()
+    fetch_pool = ThreadPoolExecutor(workers)
+    tts_pool   = ThreadPoolExecutor(workers)
+    fetching, synth, ready = set(), {}, {}
+    seq = nxt = 0
+
+    misses, mlock = [0], threading.Lock()   # in a row, all threads
+
+    def missed(n):
+        """Adds a miss (n=1) or, for a usable fact, resets (n=0)."""
+        with mlock:
+            misses[0] = misses[0]+1 if n else 0
+
+    def timed_fetch():
+        with mlock:
+            n = misses[0]
+        if n:   # before the timer: waiting isn't network time
+            time.sleep(min(FETCH_BACKOFF * 2**(n-1), FETCH_BACKOFF_MAX))
+        t0 = time.perf_counter()
         try:
-            f = requests.get(
-                'https://uselessfacts.jsph.pl/random.json?language=en',
-                timeout=8).json().get('text','').strip()
-            k = f.lower().replace(' ', '')
-            if not f or k in seen_this_run or k in used_ever:
-                time.sleep(0.2); continue
-            seen_this_run.add(k)
-        except:
-            fails += 1; time.sleep(1); continue
+            return fetch_fact(session, facts_url)
+        finally:
+            rep.add_net('facts', time.perf_counter()-t0)
 
-        try:
-            p = f'{out_dir}/audio/f{len(facts)}.mp3'
-            gTTS(text=f, lang='en').save(p)
-            seg = AudioSegment.from_mp3(p).fade_in(250).fade_out(400)
-            seg += AudioSegment.silent(600)
-            d = seg.duration_seconds
-            if total + d > 60:
-                fails += 1; time.sleep(0.2); continue
-            seg.export(p, format='mp3')
-            facts.append(f)
-            apaths.append(p)
-            durs.append(d)
-            wtimes.append(get_word_timestamps(f.split(), d))
-            total += d; fails = 0
-            log.info(f'  [{len(facts)}] {total:.1f}s  {f[:65]}')
-            if total >= 50: break
-        except Exception as e:
-            log.warning(f'Audio: {e}'); fails += 1; time.sleep(0.5)
-
-    used_ever.update(seen_this_run)
-    save_used_facts(used_ever)
+    # Target: 50-60s of facts (hook adds 2s on top)
+    try:
+        while total < 50 and fails < 60:
+            # Keep the producer topped up, bounded by unfinished work
+            while len(fetching) + len(synth) + len(ready) < 2*workers:
+                fetching.add(fetch_pool.submit(timed_fetch))
+            finished, _ = wait(fetching | set(synth),
+                               return_when=FIRST_COMPLETED)
+
+            for fut in finished:
+                if fut in fetching:
+                    fetching.discard(fut)
+                    try:
+                        f = fut.result()
+                    except Exception:
+                        fails += 1; missed(1); continue
+                    if not f or not used.claim(f):
+                        fails += 1; missed(1); continue
+                    missed(0)
+                    claimed.add(f)
+                    p = f'{out_dir}/audio/c{seq}.mp3'
+                    synth[tts_pool.submit(synth_fact, f, p, tts, cache,
+                                          engine, rep.add_net)] = \
+                        (seq, f, p)
+                    seq += 1
+                else:
+                    s_, f, p = synth.pop(fut)
+                    try:
+                        ready[s_] = (f, p, fut.result())
+                    except Exception as e:
+                        log.warning(f'Audio: {e}')
+                        ready[s_] = None; fails += 1
+
+            # Assemble in fetch order
+            while nxt in ready and total < 50:
+                item = ready.pop(nxt); nxt += 1
+                if item is None: continue
+                f, p, seg = item
+                d = seg.duration_seconds
+                if total + d > 60:
+                    fails += 1; continue
+                p = f'{out_dir}/audio/f{len(facts)}.wav'
+                seg.export(p, format='wav')
+                facts.append(f)
+                clips.append(seg2np(seg))
+                durs.append(d)
+                wtimes.append(get_word_timestamps(f.split(), d))
+                total += d; fails = 0
+                log.info(f'  [{len(facts)}] {total:.1f}s  {f[:65]}')
+    finally:
+        for fut in fetching | set(synth):
+            fut.cancel()
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        tts_pool.shutdown(wait=True, cancel_futures=True)
+        if own_session:
+            session.close()
+        for p in glob.glob(f'{out_dir}/audio/c*.mp3'):
+            os.remove(p)
+        used.release(claimed - set(facts))
+
+    if not facts:
+        raise RuntimeError(f'No facts fetched ({fails} misses in a row)')
+    used.commit(facts)
+    used.save()
 
     fstarts = [HOOK_DUR + sum(durs[:i]) for i in range(len(durs))]
     total_with_hook = total + HOOK_DUR
     log.info(f'✅ {len(facts)} facts | {total_with_hook:.1f}s '
              f'(inc. {HOOK_DUR}s hook)')
-    return facts, apaths, durs, wtimes, fstarts, total_with_hook
+    return facts, clips, durs, wtimes, fstarts, total_with_hook
 
 # ── 2. Mix audio (hook whoosh + ding + tts + music) ───────────────
-def mix_audio(apaths, fstarts, total, out_dir):
+def add_stem(buf, clip, start, gain_db=0.0):
+    """Adds `clip` into `buf` at `start` seconds, `gain_db` applied."""
+    i0 = int(round(start*SR))
+    n  = min(len(clip), len(buf)-i0)
+    if n > 0:
+        buf[i0:i0+n] += clip[:n] * np.float32(10**(gain_db/20))
+
+def mix_audio(clips, fstarts, total, out_dir):
+    """
+    Sums every stem into one float32 buffer at its sample offset and
+    writes it as WAV. `clips` are the TTS samples from
+    fetch_and_generate (WAV paths are accepted too).
+    """
     log.info('Mixing audio...')
-    music  = gen_music(total)
-    ding   = gen_ding()
-    whoosh = gen_whoosh()
-    tts_t  = AudioSegment.silent(int(total*1000))
-    dng_t  = AudioSegment.silent(int(total*1000))
-    whs_t  = AudioSegment.silent(int(total*1000))
+    buf    = np.zeros(int(total*SR), np.float32)
+    add_stem(buf, gen_music(total), 0, -14)
 
-    for p, s in zip(apaths, fstarts):
-        tts_t = tts_t.overlay(
-            AudioSegment.from_mp3(p), position=int(s*1000))
-        dng_t = dng_t.overlay(ding, position=int(s*1000))
+    ding   = gen_ding()
+    for c, s in zip(clips, fstarts):
+        if isinstance(c, str):
+            c = seg2np(AudioSegment.from_wav(c))
+        add_stem(buf, c, s)
+        add_stem(buf, ding, s, -3)
 
     # Whoosh at the hook → facts transition
-    whs_t = whs_t.overlay(
-        whoosh, position=int((HOOK_DUR-0.4)*1000))
+    add_stem(buf, gen_whoosh(), HOOK_DUR-0.4, -2)
 
-    mix_path = f'{out_dir}/audio/mix.mp3'
-    ((music-14).overlay(tts_t).overlay(dng_t-3).overlay(whs_t-2)
-     ).export(mix_path, format='mp3')
+    mix_path = f'{out_dir}/audio/mix.wav'
+    np2seg(buf).export(mix_path, format='wav')
     log.info('✅ Audio mixed')
     return mix_path
 
 # ── 3. Download backgrounds ───────────────────────────────────────
-def download_backgrounds(total, out_dir):
+def vgradient(c1, c2, w=W, h=H):
+    """Top-to-bottom c1 → c2 gradient, built as one column and stretched."""
+    y   = np.arange(h)[:, None]
+    col = np.array(c1) + ((np.array(c2)-np.array(c1))*y/h).astype(int)
+    return Image.fromarray(col.astype(np.uint8)[:, None]
+                           .repeat(w, axis=1), 'RGB')
+
+def download_backgrounds(total, out_dir, pool=None, session=None):
+    """
+    Fills out_dir/images from the persistent image pool while a few
+    fresh Unsplash photos are downloaded into it. The download is only
+    waited for in full when the pool can't cover this video on its
+    own; otherwise a slow Unsplash just means the new photos land in
+    the pool for the next run. `pool` and `session` are shared in
+    batch mode.
+    """
     log.info('Downloading backgrounds...')
     KEY    = os.environ.get('UNSPLASH_KEY', '')
     needed = math.ceil(total/4) + 3
-    urls   = []
-
-    for pg in range(1, 8):
-        try:
-            rs = requests.get(
-                'https://api.unsplash.com/search/photos',
-                headers={'Authorization': f'Client-ID {KEY}'},
-                params={
-                    'query': 'abstract colorful texture',
-                    'orientation': 'portrait',
-                    'per_page': 10, 'page': pg,
-                    'content_filter': 'high',
-                }, timeout=10)
-            for p in rs.json().get('results', []):
-                urls.append(
-                    f"{p['urls']['raw']}&w={W}&h={H}"
-                    f"&fit=crop&crop=entropy")
-            if len(urls) >= needed: break
-            time.sleep(0.3)
-        except Exception as e:
-            log.warning(f'Unsplash: {e}')
+    pool   = ImagePool() if pool is None else pool
+    want   = max(TOPUP, needed - len(pool))
+    job, fresh = start_top_up(pool, KEY, want, W, H,
+                              net=report_for(out_dir).add_net,
+                              session=session)
+    job.join(None if len(pool) < needed else TOPUP_WAIT)
+    log.info(f'  🗂️  Pool: {len(pool)} images ({len(fresh)} new)')
 
     ipaths, dcols = [], []
-    for i, url in enumerate(urls[:needed]):
+    for i, (src, dc) in enumerate(pool.pick(needed, prefer=fresh)):
         path = f'{out_dir}/images/bg{i}.jpg'
-        try:
-            img = Image.open(
-                io.BytesIO(requests.get(url, timeout=15).content)
-            ).convert('RGB')
-            rat = W/H
-            if img.width/img.height > rat:
-                nw  = int(img.height*rat)
-                img = img.crop(((img.width-nw)//2, 0,
-                                (img.width+nw)//2, img.height))
-            else:
-                nh  = int(img.width/rat)
-                img = img.crop((0, (img.height-nh)//2,
-                                img.width, (img.height+nh)//2))
-            img  = img.resize((W, H), Image.LANCZOS)
-            sm   = np.array(img.resize((50,50))).reshape(-1,3)
-            dcols.append(
-                tuple(int(x) for x in np.median(sm, axis=0)))
-            img.filter(ImageFilter.GaussianBlur(1.5)).save(
-                path, quality=92)
-            ipaths.append(path)
-            log.info(f'  ✅ Image {i+1}/{needed}')
-        except Exception as e:
-            log.warning(f'Image {i}: {e}')
-            dcols.append((20,20,60))
+        shutil.copyfile(src, path)
+        ipaths.append(path); dcols.append(dc)
+    pool.save()
 
     if not ipaths:
         rnd = random.Random(int(time.time()))
@@ -247,66 +351,83 @@ def download_backgrounds(total, out_dir):
                   rnd.randint(100,200))
             c2 = (rnd.randint(100,200), rnd.randint(20,100),
                   rnd.randint(20,80))
-            img = Image.new('RGB', (W, H))
-            dr2 = ImageDraw.Draw(img)
-            for y in range(H):
-                dr2.line([0,y,W,y], fill=(
-                    c1[0]+int((c2[0]-c1[0])*y/H),
-                    c1[1]+int((c2[1]-c1[1])*y/H),
-                    c1[2]+int((c2[2]-c1[2])*y/H)))
-            img.save(path)
+            vgradient(c1, c2).save(path)
             ipaths.append(path); dcols.append(c1)
 
     log.info(f'✅ {len(ipaths)} backgrounds ready')
     return ipaths, dcols
 
+def frame_times(total):
+    """Frame timestamps, identical to what MoviePy's iter_frames yields."""
+    return np.arange(0, total, 1.0/FPS)
+
 # ── 4. Animated background ────────────────────────────────────────
-def build_background(ipaths, dcols, total, out_dir):
-    log.info('Building animated background...')
+# Single-pass mode computes the background inside the render callback
+# straight from the stills; set SHORTS_SINGLE_PASS=0 to go back to
+# encoding an intermediate bg.mp4 first.
+SINGLE_PASS = os.environ.get('SHORTS_SINGLE_PASS', '1') != '0'
+
+def background_frames(ipaths, dcols, dur=4, fade=0.5):
+    """
+    Frame function t -> uint8 (H,W,3) for the looping Ken-Burns bg.
+
+    Still i runs for `dur` seconds from i*(dur-fade), crossfading into
+    the next over the last `fade` seconds. A bisect over those start
+    times finds the still at t, plus the previous one while they
+    overlap, so a frame costs the same however many stills there are.
+
+    Each still is zoomed with one resize of its centre box and tinted
+    with one lookup table over all three channels, both in PIL; the
+    frame is only converted to a numpy array at the very end.
+    """
     import math as _m
+    from bisect import bisect_right
+    levels = np.arange(256, dtype=np.float32)
 
-    def mk_bg(path, dur, dc):
-        arr     = np.array(Image.open(path).convert('RGB'))
-        r, g, b = dc
+    def mk_bg(path, dc):
+        src = Image.open(path).convert('RGB')
+        src.load()
         def fn(t):
+            """The still's frame at local time t, as a PIL image."""
             sc     = 1.0 + 0.08*(t/dur)
             sw, sh = int(W/sc), int(H/sc)
             x0, y0 = (W-sw)//2, (H-sh)//2
-            crop   = arr[y0:y0+sh, x0:x0+sw]
-            fr     = np.array(
-                Image.fromarray(crop).resize((W,H), Image.BILINEAR),
-                dtype=np.float32)
             a_     = 0.06 + 0.04*_m.sin(t*0.5)
-            fr[:,:,0] = np.clip(fr[:,:,0]*(1-a_)+r*a_, 0, 255)
-            fr[:,:,1] = np.clip(fr[:,:,1]*(1-a_)+g*a_, 0, 255)
-            fr[:,:,2] = np.clip(fr[:,:,2]*(1-a_)+b*a_, 0, 255)
-            return fr.astype(np.uint8)
-        return VideoClip(fn, duration=dur)
-
-    def xfade(c1, c2, fade=0.5):
-        d = c1.duration + c2.duration - fade
-        def fn(t):
-            if t < c1.duration - fade:
-                return c1.get_frame(t)
-            elif t >= c1.duration:
-                return c2.get_frame(t - c1.duration + fade)
-            else:
-                a_ = (t-(c1.duration-fade))/fade
-                return (
-                    c1.get_frame(min(t, c1.duration-0.001))*(1-a_) +
-                    c2.get_frame(t-(c1.duration-fade))*a_
-                ).astype(np.uint8)
-        return VideoClip(fn, duration=d)
-
-    bgs = [mk_bg(ipaths[i], 4,
-                 dcols[i] if i < len(dcols) else (20,20,60))
-           for i in range(len(ipaths))]
-    bg  = bgs[0]
-    for c in bgs[1:]:
-        bg = xfade(bg, c, 0.5)
+            # Same float32 arithmetic as tinting every pixel, per level
+            tint   = np.array([c*a_ for c in dc], np.float32)[:,None]
+            lut    = np.clip(levels*(1-a_) + tint, 0, 255)
+            return src.resize((W,H), Image.BILINEAR,
+                              box=(x0, y0, x0+sw, y0+sh)).point(
+                lut.astype(np.uint8).ravel().tolist())
+        return fn
+
+    fns    = [mk_bg(ipaths[i],
+                    dcols[i] if i < len(dcols) else (20,20,60))
+              for i in range(len(ipaths))]
+    starts = [i*(dur-fade) for i in range(len(fns))]
+    length = starts[-1] + dur
+
+    def frame(t):
+        t = t % length
+        i = bisect_right(starts, t) - 1
+        if i == 0 or t >= starts[i-1] + dur:
+            return np.array(fns[i](t - starts[i]))
+        return np.array(Image.blend(
+            fns[i-1](min(t - starts[i-1], dur-0.001)),
+            fns[i](t - starts[i]), (t - starts[i])/fade))
+    return frame
+
+def build_background(ipaths, dcols, total, out_dir):
+    log.info('Building animated background...')
+    fn      = background_frames(ipaths, dcols)
     bg_path = f'{out_dir}/bg.mp4'
-    bg.loop(duration=total).write_videofile(
-        bg_path, fps=FPS, audio=False, verbose=False, logger=None)
+    if ENCODER == 'ffmpeg':
+        with FFmpegPipe(bg_path, (W,H), FPS) as enc:
+            for t in frame_times(total):
+                enc.write(fn(t))
+    else:
+        VideoClip(fn, duration=total).write_videofile(
+            bg_path, fps=FPS, audio=False, verbose=False, logger=None)
     log.info('✅ Background done')
     return bg_path
 
@@ -320,9 +441,12 @@ PSZ  = _rng.randint(2, 7, NP); PPA  = _rng.uniform(0, 2*np.pi, NP)
 import math
 
 # ── 6. Drawing helpers ────────────────────────────────────────────
+# Every helper returns the list of (x0,y0,x1,y1) boxes it drew into,
+# so render_video only has to blend and clear those regions.
 LW, LH, BP = 25, 78, 28
 
 def draw_particles(draw, t):
+    boxes = []
     for i in range(NP):
         py_ = (PY[i]-PVY[i]*t) % H
         px_ = (PX[i]+PVX[i]*t) % W
@@ -330,6 +454,9 @@ def draw_particles(draw, t):
         sz_ = int(PSZ[i])
         draw.ellipse([px_-sz_,py_-sz_,px_+sz_,py_+sz_],
                     fill=(255,255,210,max(15,a_)))
+        boxes.append((int(px_)-sz_-1, int(py_)-sz_-1,
+                      int(px_)+sz_+2, int(py_)+sz_+2))
+    return boxes
 
 def draw_progress(draw, t, total):
     p  = min(t/total, 1.0)
@@ -341,6 +468,7 @@ def draw_progress(draw, t, total):
         draw.rounded_rectangle([x1,by,fx,by+10], radius=5,
                                fill=(255,220,0,200))
     draw.ellipse([fx-7,by-3,fx+7,by+13], fill=(255,255,255,200))
+    return [(min(x1,fx-7), by-3, max(x2,fx+7)+1, by+14)]
 
 def draw_dots(draw, t, facts, fstarts, durs):
     cur = -1
@@ -348,6 +476,7 @@ def draw_dots(draw, t, facts, fstarts, durs):
         if fstarts[i] <= t < fstarts[i]+durs[i]:
             cur = i; break
     n  = len(facts)
+    if not n: return []
     sp = min(32, (W-120)//max(n,1))
     sx = W//2 - n*sp//2
     dy = H-85
@@ -359,28 +488,32 @@ def draw_dots(draw, t, facts, fstarts, durs):
         else:
             draw.ellipse([dx-4,dy-4,dx+4,dy+4],
                         fill=(255,255,255,90))
+    return [(sx+sp//2-9, dy-9, sx+(n-1)*sp+sp//2+10, dy+10)]
+
+def ramp_alpha(t_in, dur, peak=255, rise=0.35, fall=0.5):
+    """Alpha `t_in` seconds into a card: fade in, hold, fade out."""
+    a = int(peak*(min(t_in/rise,1.0) if t_in<dur-fall
+                  else (dur-t_in)/fall))
+    return max(0, min(peak, a))
 
-def draw_hook(draw, t):
+def hook_alpha(t):
+    # Fade in fast, hold, flash out
+    return ramp_alpha(t, HOOK_DUR, rise=0.3, fall=0.3)
+
+def draw_hook(draw, t, motion_t=None):
     """
     First HOOK_DUR seconds — big attention-grabbing card.
     Critical for retention: viewers decide in 3s whether to keep watching.
+    The pulse follows `motion_t` when given (see FRAME_MEMO).
     """
-    if t >= HOOK_DUR: return
-
-    # Fade in fast, hold, flash out
-    if t < 0.3:
-        a = int(255 * (t/0.3))
-    elif t < HOOK_DUR - 0.3:
-        a = 255
-    else:
-        a = int(255 * ((HOOK_DUR-t)/0.3))
-    a = max(0, min(255, a))
+    if t >= HOOK_DUR: return []
+    a = hook_alpha(t)
 
     # Full black overlay
     draw.rectangle([0, 0, W, H], fill=(0,0,0,int(a*0.85)))
 
     # Pulsing scale effect (using y offset as proxy)
-    pulse = int(4*math.sin(t*12))
+    pulse = int(4*math.sin((t if motion_t is None else motion_t)*12))
 
     # "WAIT..." top
     draw.text((W//2, H//2-280+pulse),
@@ -407,34 +540,48 @@ def draw_hook(draw, t):
     draw.text((W//2, H//2+220),
               '🔔 Subscribe for daily facts!', font=F_WM,
               fill=(255,255,255,int(a*0.65)), anchor='mm')
+    return [(0, 0, W, H)]
 
-def draw_karaoke(draw, t, idx, facts, fstarts, durs, word_times):
-    fact  = facts[idx]
-    ft    = t - fstarts[idx]
-    words = fact.split()
-    wts   = word_times[idx]
-    cur_w = 0
-    for wi, (ws, we) in enumerate(wts):
-        if ws <= ft < we: cur_w = wi; break
-        if ft >= we:      cur_w = wi
-
+def build_karaoke_layers(idx, fact):
+    """
+    Pre-renders everything draw_karaoke needs for one fact: the card
+    with the mask of its footprint, the label's stroke and fill masks,
+    and per word, the card crop under it with the word drawn in each
+    of its three states (spoken, current, upcoming). Pasted, these
+    give exactly the pixels drawing the card, label and words straight
+    onto the canvas would.
+    """
     lines   = textwrap.wrap(fact, width=LW) or [fact]
     bw      = W-80
     bh      = len(lines)*LH + BP*2
     bx1     = (W-bw)//2
     by1     = H//2 - bh//2
-    bx2, by2 = bx1+bw, by1+bh
-    label_y  = by1-64
-
-    draw.rounded_rectangle([bx1,by1,bx2,by2], radius=28,
-                           fill=(10,10,30,195))
-    draw.rounded_rectangle([bx1,by1,bx2,by2], radius=28,
-                           outline=(255,255,255,55), width=2)
-    draw.text((W//2,label_y), f'✦  FACT  #{idx+1}  ✦',
-              font=F_LBL, fill=(255,220,0,255), anchor='mm',
-              stroke_width=2, stroke_fill=(0,0,0,200))
-
-    gwi  = 0
+    label_y = by1-64
+    label   = f'✦  FACT  #{idx+1}  ✦'
+
+    card = Image.new('RGBA', (bw+1, bh+1), (0,0,0,0))
+    mask = Image.new('L', card.size, 0)
+    dc, dm = ImageDraw.Draw(card), ImageDraw.Draw(mask)
+    dc.rounded_rectangle([0,0,bw,bh], radius=28, fill=(10,10,30,195))
+    dc.rounded_rectangle([0,0,bw,bh], radius=28,
+                         outline=(255,255,255,55), width=2)
+    dm.rounded_rectangle([0,0,bw,bh], radius=28, fill=255,
+                         outline=255, width=2)
+
+    probe = ImageDraw.Draw(Image.new('RGBA', (1,1)))
+    lbox  = probe.textbbox((W//2,label_y), label, font=F_LBL,
+                           anchor='mm', stroke_width=2)
+    top   = min(by1, lbox[1])
+    # Drawing text blends its stroke colour, then its fill colour,
+    # into the canvas through glyph masks: keep the two masks
+    lmasks = []
+    for sw in (2, 0):
+        m = Image.new('L', (lbox[2]-lbox[0], lbox[3]-lbox[1]), 0)
+        ImageDraw.Draw(m).text((W//2-lbox[0], label_y-lbox[1]), label,
+                               font=F_LBL, fill=255, anchor='mm',
+                               stroke_width=sw, stroke_fill=255)
+        lmasks.append(m)
+    sprites = []
     yp   = by1+BP+LH//2
     sp_w = max(textw(F_MAIN,' '), 12)
     for line in lines:
@@ -443,39 +590,76 @@ def draw_karaoke(draw, t, idx, facts, fstarts, durs, word_times):
         lnw = sum(textw(F_MAIN,w)+sp_w for w in lwords)-sp_w
         xp  = W//2 - lnw//2
         for w in lwords:
-            ww  = textw(F_MAIN, w)
-            col = ((160,160,160,255) if gwi < cur_w else
-                   (255,220,0,  255) if gwi == cur_w else
-                   (255,255,255,255))
-            draw.text((xp,yp), w, font=F_MAIN, fill=col,
-                      anchor='lm', stroke_width=2,
-                      stroke_fill=(0,0,0,180))
-            xp  += ww+sp_w; gwi += 1
+            x0, y0, x1, y1 = probe.textbbox(
+                (xp,yp), w, font=F_MAIN, anchor='lm', stroke_width=2)
+            states = []
+            for col in [(160,160,160,255), (255,220,0,255),
+                        (255,255,255,255)]:
+                spr = card.crop((x0-bx1, y0-by1, x1-bx1, y1-by1))
+                ImageDraw.Draw(spr).text(
+                    (xp-x0,yp-y0), w, font=F_MAIN, fill=col,
+                    anchor='lm', stroke_width=2,
+                    stroke_fill=(0,0,0,180))
+                states.append(spr)
+            sprites.append(((x0,y0), states))
+            xp += textw(F_MAIN, w)+sp_w
         yp += LH
+    return {'card': card, 'mask': mask, 'pos': (bx1, by1),
+            'label': (lbox[:2], lmasks), 'top': top,
+            'words': sprites}
 
-def draw_top(draw, t, total):
+def current_word(ft, wts):
+    """Index of the word being spoken `ft` seconds into the fact."""
+    cur_w = 0
+    for wi, (ws, we) in enumerate(wts):
+        if ws <= ft < we: cur_w = wi; break
+        if ft >= we:      cur_w = wi
+    return cur_w
+
+def draw_karaoke(cv, t, idx, fstarts, word_times, layers):
+    """Pastes the cached card and word sprites for fact `idx` into cv."""
+    cur_w = current_word(t - fstarts[idx], word_times[idx])
+
+    # Replaces what's under the card, as drawing it would
+    cv.paste(layers['card'], layers['pos'], layers['mask'])
+    pos, (stroke, fill) = layers['label']
+    cv.paste((0,0,0,200), pos, stroke)
+    cv.paste((255,220,0,255), pos, fill)
+    for gwi, (pos, states) in enumerate(layers['words']):
+        st = 0 if gwi < cur_w else 1 if gwi == cur_w else 2
+        cv.paste(states[st], pos)
+    bottom = layers['pos'][1] + layers['card'].height
+    return [(0, layers['top'], W, bottom)]
+
+def top_phase(t, total):
+    """('intro'|'sub'|'mark', alpha) of the top banner, None in the hook."""
     sub_s      = total/2
     IDUR, SDUR = 2.0, 4.5
     # Skip top banner during hook
-    if t < HOOK_DUR: return
+    if t < HOOK_DUR: return None
 
     t_adj = t - HOOK_DUR    # time relative to post-hook
 
     if t_adj < IDUR:
-        a = int(255*(min(t_adj/0.35,1.0) if t_adj<IDUR-0.5
-                     else (IDUR-t_adj)/0.5))
-        a = max(0, min(255, a))
+        return 'intro', ramp_alpha(t_adj, IDUR)
+    elif sub_s <= t < sub_s+SDUR:
+        return 'sub', ramp_alpha(t-sub_s, SDUR, peak=220)
+    return 'mark', 140
+
+def draw_top(draw, t, total):
+    phase = top_phase(t, total)
+    if phase is None: return []
+    kind, a = phase
+
+    if kind == 'intro':
         draw.rectangle([0,0,W,230], fill=(0,0,0,int(a*0.85)))
         draw.text((W//2,78), '★  Did You Know?  ★', font=F_BIG,
                   fill=(255,220,0,a), anchor='mm',
                   stroke_width=2, stroke_fill=(0,0,0,a))
         draw.text((W//2,172), '- Mind-Blowing Facts -', font=F_MED,
                   fill=(255,255,255,a), anchor='mm')
-    elif sub_s <= t < sub_s+SDUR:
-        ft = t-sub_s
-        a  = int(220*(min(ft/0.35,1.0) if ft<SDUR-0.5
-                      else (SDUR-ft)/0.5))
-        a  = max(0, min(220, a))
+        return [(0, 0, W, 231)]
+    elif kind == 'sub':
         bw_, bh_, by_ = 740, 100, 65
         bx_ = W//2-bw_//2
         draw.rounded_rectangle([bx_,by_,bx_+bw_,by_+bh_],
@@ -487,112 +671,270 @@ def draw_top(draw, t, total):
                   '[+]  Follow for more facts!', font=F_MED,
                   fill=(255,255,255,a), anchor='mm',
                   stroke_width=1, stroke_fill=(0,0,0,150))
+        return [(bx_, by_, bx_+bw_+1, by_+bh_+1),
+                draw.textbbox((W//2,by_+bh_//2),
+                              '[+]  Follow for more facts!',
+                              font=F_MED, anchor='mm', stroke_width=1)]
     else:
         draw.text((W//2,52), '★ Did You Know? ★', font=F_WM,
-                  fill=(255,255,255,140), anchor='mm',
-                  stroke_width=1, stroke_fill=(0,0,0,140))
+                  fill=(255,255,255,a), anchor='mm',
+                  stroke_width=1, stroke_fill=(0,0,0,a))
+        return [draw.textbbox((W//2,52), '★ Did You Know? ★',
+                              font=F_WM, anchor='mm', stroke_width=1)]
+
+OUTRO_DUR = 2.5
 
 def draw_outro(draw, t_in):
-    DUR = 2.5
-    if t_in >= DUR: return
-    a = int(255*(min(t_in/0.35,1.0) if t_in<DUR-0.5
-                 else (DUR-t_in)/0.5))
-    a = max(0, min(255, a))
+    if t_in >= OUTRO_DUR: return []
+    a = ramp_alpha(t_in, OUTRO_DUR)
     draw.rectangle([0,H-290,W,H], fill=(0,0,0,int(a*0.88)))
     draw.text((W//2,H-210), ">> That's a Wrap! <<", font=F_BIG,
               fill=(255,220,0,a), anchor='mm',
               stroke_width=2, stroke_fill=(0,0,0,a))
     draw.text((W//2,H-110), 'Like  |  Follow  |  Share',
               font=F_MED, fill=(255,255,255,a), anchor='mm')
+    return [(0, H-290, W, H)]
 
 # ── 7. Render video ───────────────────────────────────────────────
-def render_video(facts, durs, wtimes, fstarts, total,
-                 bg_path, mix_path, out_dir):
-    log.info('Rendering video...')
-    bg_rd = VideoFileClip(bg_path)
-
-    def render(t):
-        bg  = bg_rd.get_frame(min(t, total-0.001)).copy()
-        cv  = Image.new('RGBA', (W,H), (0,0,0,0))
-        dr  = ImageDraw.Draw(cv)
-
-        draw_particles(dr, t)
+# Worker processes for chunked rendering; 1 renders in-process.
+# SHORTS_ENCODER picks the ffmpeg pipe (default) or MoviePy.
+RENDER_WORKERS = int(os.environ.get('SHORTS_RENDER_WORKERS',
+                                    os.cpu_count() or 1))
+# Opt-in: redraw the overlay only when its state key changes. Particles,
+# the progress bar and the hook pulse then move MOTION_FPS times a
+# second (FPS = as smooth as without memoisation).
+FRAME_MEMO = os.environ.get('SHORTS_FRAME_MEMO', '') not in ('', '0')
+MOTION_FPS = float(os.environ.get('SHORTS_MOTION_FPS', 15))
+
+def make_renderer(scene, stats=None):
+    """
+    Builds the frame function t -> uint8 (H,W,3) from a picklable scene
+    description (see render_video), so worker processes can rebuild it.
+    Per-frame and per-helper times are recorded into `stats`.
+    """
+    st = stats or FrameStats()
+    facts, durs    = scene['facts'], scene['durs']
+    wtimes, total  = scene['wtimes'], scene['total']
+    fstarts, bg    = scene['fstarts'], scene['bg']
+    if isinstance(bg, str):
+        bg_rd    = VideoFileClip(bg)
+        bg_frame = lambda t: bg_rd.get_frame(t).copy()
+    else:
+        bg_frame = background_frames(*bg)
+
+    layers = {}
+    comp   = Compositor(W, H)
+    # One canvas for the whole render: only the boxes drawn into are
+    # blended, then wiped back to transparent for the next frame.
+    cv     = Image.new('RGBA', (W,H), (0,0,0,0))
+    dr     = ImageDraw.Draw(cv)
+    memo   = {'key': None, 'layers': []}
+
+    def active_fact(t):
+        for i in range(len(facts)):
+            if fstarts[i] <= t < fstarts[i]+durs[i]:
+                return i
+        return -1
+
+    def state_key(t, tm):
+        """Everything the overlay at t depends on, tm = motion time."""
+        if t < HOOK_DUR:
+            return tm, hook_alpha(t)
+        i = active_fact(t)
+        return (tm, i,
+                i >= 0 and current_word(t-fstarts[i], wtimes[i]),
+                top_phase(t, total),
+                t > total-OUTRO_DUR and
+                ramp_alpha(t-(total-OUTRO_DUR), OUTRO_DUR))
+
+    def draw(t, tm):
+        """Draws the overlay into cv; returns its merged dirty boxes."""
+        dirty = draw_particles(dr, tm);         st.lap('particles')
 
         if t < HOOK_DUR:
             # Show hook
-            draw_hook(dr, t)
+            dirty += draw_hook(dr, t, tm);      st.lap('hook')
         else:
             # Show facts
-            for i in range(len(facts)):
-                if fstarts[i] <= t < fstarts[i]+durs[i]:
-                    draw_karaoke(dr, t, i, facts,
-                                 fstarts, durs, wtimes)
-                    break
-            draw_top(dr, t, total)
-            draw_dots(dr, t, facts, fstarts, durs)
-            draw_progress(dr, t, total)
-            if t > total-2.5:
-                draw_outro(dr, t-(total-2.5))
-
-        ov  = np.array(cv)
-        alp = ov[:,:,3:4].astype(np.float32)/255.0
-        return (bg.astype(np.float32)*(1-alp) +
-                ov[:,:,:3].astype(np.float32)*alp).astype(np.uint8)
+            i = active_fact(t)
+            if i >= 0:
+                if i not in layers:
+                    layers[i] = build_karaoke_layers(i, facts[i])
+                dirty += draw_karaoke(cv, t, i, fstarts, wtimes,
+                                      layers[i])
+            st.lap('karaoke')
+            dirty += draw_top(dr, t, total);    st.lap('top')
+            dirty += draw_dots(dr, t, facts, fstarts, durs)
+            st.lap('dots')
+            dirty += draw_progress(dr, tm, total)
+            st.lap('progress')
+            if t > total-OUTRO_DUR:
+                dirty += draw_outro(dr, t-(total-OUTRO_DUR))
+                st.lap('outro')
+        return merge_boxes(dirty, W, H)
 
-    out_path = f'{out_dir}/short.mp4'
-    clip = VideoClip(render, duration=total)
-    clip = clip.set_audio(AudioFileClip(mix_path))
-    clip.write_videofile(out_path, fps=FPS, codec='libx264',
-                         audio_codec='aac', bitrate='5000k',
-                         logger=None)
-    log.info(f'✅ Video: {out_path}')
-    return out_path
-
-# ── 8. Thumbnail ──────────────────────────────────────────────────
-def generate_thumbnail(facts, ipaths, out_dir):
-    import glob, textwrap as tw2
+    def render(t):
+        st.start()
+        bg = bg_frame(min(t, total-0.001));     st.lap('bg')
+        if not FRAME_MEMO:
+            dirty = draw(t, t)
+            comp.over(bg, cv, dirty)
+        else:
+            tm  = math.floor(t*MOTION_FPS + 1e-6)/MOTION_FPS
+            key = state_key(t, tm)
+            if key != memo['key']:
+                dirty = draw(t, tm)
+                memo['key'], memo['layers'] = key, comp.layers(cv, dirty)
+            else:
+                dirty = []
+                st.lap('memo_hit')
+            comp.over_layers(bg, memo['layers'])
+        for box in dirty:
+            cv.paste((0,0,0,0), box)
+        st.lap('composite')
+        st.end()
+        return bg
+
+    return render
+
+def _render_segment(job):
+    """
+    Pool worker: encodes frames [n0, n1) of the scene to `path`.
+    Returns (path, FrameStats).
+    """
+    scene, n0, n1, path = job
+    stats  = FrameStats()
+    render = make_renderer(scene, stats)
+    ts     = frame_times(scene['total'])[n0:n1]
+    if ENCODER == 'ffmpeg':
+        with FFmpegPipe(path, (W,H), FPS, faststart=False) as enc:
+            for t in ts:
+                enc.write(render(t))
+    else:
+        writer = FFMPEG_VideoWriter(path, (W,H), FPS, codec='libx264',
+                                    bitrate='5000k')
+        for t in ts:
+            writer.write_frame(render(t))
+        writer.close()
+    return path, stats
+
+def render_pool(workers):
+    """
+    Process pool for _render_parallel. spawn, not fork: generate()
+    renders from a thread of its stage graph.
+    """
+    from multiprocessing import get_context
+    return get_context('spawn').Pool(workers)
 
-    bg_files = sorted(glob.glob(f'{out_dir}/images/bg*.jpg'))
-    if not bg_files:
-        bg_img = Image.new('RGB', (W,H))
-        dr = ImageDraw.Draw(bg_img)
-        for y in range(H):
-            dr.line([0,y,W,y],
-                   fill=(int(10+60*y/H),0,int(80+120*y/H)))
+def _render_parallel(scene, mix_path, out_path, workers, pool=None):
+    """
+    Splits the timeline into one segment per worker, renders them in a
+    process pool (`pool`, or a fresh one), then concatenates the
+    segments without re-encoding and muxes the audio once. Returns the
+    workers' merged FrameStats.
+    """
+    import tempfile
+
+    nframes = len(frame_times(scene['total']))
+    step    = math.ceil(nframes/workers)
+    seg_dir = tempfile.mkdtemp(dir=os.path.dirname(out_path))
+    jobs    = [(scene, n0, min(n0+step, nframes),
+                f'{seg_dir}/seg{k:03d}.mp4')
+               for k, n0 in enumerate(range(0, nframes, step))]
+    log.info(f'  🧵 {len(jobs)} segments × ~{step} frames '
+             f'on {workers} workers')
+    if pool:
+        done = pool.map(_render_segment, jobs)
     else:
-        best, bsc = bg_files[0], 0
-        for p in bg_files[:6]:
-            try:
-                sm  = np.array(Image.open(p).resize((40,40)))
-                sat = np.std(sm.reshape(-1,3), axis=0).mean()
-                if sat > bsc: bsc = sat; best = p
-            except: pass
-        bg_img = Image.open(best).convert('RGB').resize(
-            (W,H), Image.LANCZOS)
+        with render_pool(workers) as pool:
+            done = pool.map(_render_segment, jobs)
+
+    segs, stats = [p for p, _ in done], FrameStats()
+    for _, st in done:
+        stats.merge(st)
+    concat_segments(segs, mix_path, out_path)
+    for p in segs:
+        os.remove(p)
+    os.rmdir(seg_dir)
+    return stats
 
-    bg_img = ImageEnhance.Color(bg_img).enhance(1.6)
-    bg_img = ImageEnhance.Contrast(bg_img).enhance(1.2)
-    bg_img = ImageEnhance.Brightness(bg_img).enhance(0.55)
-    bg_img = bg_img.filter(ImageFilter.GaussianBlur(2))
+def render_video(facts, durs, wtimes, fstarts, total,
+                 bg, mix_path, out_dir, workers=None, pool=None):
+    """
+    `bg` is either the path of a pre-encoded bg.mp4 or an
+    (ipaths, dcols) pair to render the background straight from the
+    stills in the same encode. `pool` is a warm render_pool(workers).
+    """
+    log.info('Rendering video...')
+    scene = {'facts': facts, 'durs': durs, 'wtimes': wtimes,
+             'fstarts': fstarts, 'total': total, 'bg': bg}
+    workers  = workers or RENDER_WORKERS
+    out_path = f'{out_dir}/short.mp4'
 
-    # Vignette
-    vig = Image.new('RGBA', (W,H), (0,0,0,0))
-    dv  = ImageDraw.Draw(vig)
-    for r in range(280, 0, -1):
-        alpha = int(200*(1-r/280)**1.8); pad=280-r
-        dv.rounded_rectangle([pad,pad,W-pad,H-pad],
-                             radius=r*2, fill=(0,0,0,alpha))
-    bg_rgba = Image.alpha_composite(bg_img.convert('RGBA'), vig)
-
-    grad = Image.new('RGBA', (W,H), (0,0,0,0))
-    dg   = ImageDraw.Draw(grad)
-    for y in range(520):
-        a=int(230*(1-y/520)**1.3); dg.line([0,y,W,y],fill=(5,0,25,a))
-    for y in range(H-520, H):
-        a=int(240*((y-(H-520))/520)**1.2)
-        dg.line([0,y,W,y],fill=(5,0,20,a))
-    bg_rgba = Image.alpha_composite(bg_rgba, grad)
+    if workers > 1:
+        stats = _render_parallel(scene, mix_path, out_path, workers,
+                                 pool)
+    elif ENCODER == 'ffmpeg':
+        stats  = FrameStats()
+        render = make_renderer(scene, stats)
+        with FFmpegPipe(out_path, (W,H), FPS, audio=mix_path) as enc:
+            for t in frame_times(total):
+                enc.write(render(t))
+    else:
+        stats = FrameStats()
+        clip  = VideoClip(make_renderer(scene, stats), duration=total)
+        clip = clip.set_audio(AudioFileClip(mix_path))
+        clip.write_videofile(out_path, fps=FPS, codec='libx264',
+                             audio_codec='aac', bitrate='5000k',
+                             ffmpeg_params=['-movflags', '+faststart'],
+                             logger=None)
+    report_for(out_dir).add_frames(stats)
+    log.info(f'✅ Video: {out_path}')
+    return out_path
 
+# ── 8. Thumbnail ──────────────────────────────────────────────────
+def vignette_alpha(w=W, h=H, depth=280, peak=200):
+    """
+    Alpha of `depth` nested rounded rectangles, pad p drawn with radius
+    2*(depth-p) and alpha peak*(p/depth)**1.8: per pixel, the largest
+    pad whose rectangle still covers it, binary-searched for all pixels
+    at once. Computed for one quadrant and mirrored.
+    """
+    ex = np.arange(w//2, dtype=np.float32)[None, :]
+    ey = np.arange(h//2, dtype=np.float32)[:, None]
+
+    def inside(p):
+        r  = np.minimum(np.minimum(2*(depth-p), (w-2*p)/2), (h-2*p)/2)
+        c  = p + r
+        dx = np.maximum(c-ex, 0); dy = np.maximum(c-ey, 0)
+        return (ex >= p) & (ey >= p) & (dx*dx+dy*dy <= r*r+0.5*r)
+
+    lo = np.zeros((h//2, w//2), np.float32)
+    hi = np.full_like(lo, depth-1)
+    for _ in range(math.ceil(math.log2(depth))):
+        mid = np.floor((lo+hi+1)/2)
+        ok  = inside(mid)
+        lo  = np.where(ok, mid, lo); hi = np.where(ok, hi, mid-1)
+    q = (peak*(lo/depth)**1.8).astype(np.uint8)
+    q = np.hstack([q, q[:, ::-1]])
+    return np.vstack([q, q[::-1]])
+
+def shade_layer(top=520, bottom=520):
+    """Dark top/bottom gradients over the vignette, as one RGBA layer."""
+    vig = np.zeros((H, W, 4), np.uint8)
+    vig[..., 3] = vignette_alpha()
+    grad = np.zeros((H, W, 4), np.uint8)
+    y    = np.arange(top)
+    grad[:top, :, :3] = (5, 0, 25)
+    grad[:top, :, 3]  = (230*(1-y/top)**1.3).astype(np.uint8)[:, None]
+    y    = np.arange(bottom)
+    grad[H-bottom:, :, :3] = (5, 0, 20)
+    grad[H-bottom:, :, 3]  = (240*(y/bottom)**1.2).astype(np.uint8)[:, None]
+    return Image.alpha_composite(Image.fromarray(vig, 'RGBA'),
+                                 Image.fromarray(grad, 'RGBA'))
+
+def deco_layer():
+    """Corner brackets, seeded sparkles and light rays."""
     deco = Image.new('RGBA', (W,H), (0,0,0,0))
     dd   = ImageDraw.Draw(deco)
 
@@ -619,38 +961,61 @@ def generate_thumbnail(facts, ipaths, out_dir):
         dd.polygon([(-offset,0),(W//2+200,H//2),
                    (W//2+160,H//2),(-offset,60)],
                   fill=(255,230,120,max(0,alpha)))
+    return deco
+
+THUMB_CACHE_DIR = os.environ.get('SHORTS_THUMB_CACHE', '.cache/thumbs')
+# Part of the template's cache key: bump when its drawing code changes
+THUMB_TEMPLATE_V = 1
+THUMB_BADGE      = '🧠  RANDOM FACTS'
+THUMB_HEADLINE   = ('DID  YOU', 'KNOW?')
+THUMB_CTA        = ('▶  WATCH NOW', '👇  Swipe Up  👇')
+THUMB_FONTS      = {'badge': 52, 'dyk1': 128, 'dyk2': 172, 'sub': 62,
+                    'small': 44, 'fact': 42}
+
+def thumb_backdrop():
+    """
+    Everything between the background photo and the text. 'over' is
+    associative, so stacking the layers first gives the same result as
+    laying them on the photo one by one.
+    """
+    return Image.alpha_composite(shade_layer(), deco_layer())
 
-    bg_rgba = Image.alpha_composite(bg_rgba, deco)
-
+def glow_text(img, draw, pos, text, font, fill, gcol, gr=28):
+    """
+    Drop shadow, soft glow and stroked text. The glow is the text mask
+    grown by `gr` and blurred, painted in gcol as one translucent wash.
+    """
+    for ox,oy,a in [(5,8,140),(3,5,100),(1,3,60)]:
+        draw.text((pos[0]+ox,pos[1]+oy), text, font=font,
+                 fill=(0,0,0,a), anchor='mm',
+                 stroke_width=5, stroke_fill=(0,0,0,a))
+    x0, y0, x1, y1 = draw.textbbox(pos, text, font=font, anchor='mm')
+    box  = (max(x0-2*gr, 0), max(y0-2*gr, 0),
+            min(x1+2*gr, img.width), min(y1+2*gr, img.height))
+    mask = Image.new('L', (box[2]-box[0], box[3]-box[1]), 0)
+    ImageDraw.Draw(mask).text((pos[0]-box[0], pos[1]-box[1]), text,
+                              font=font, fill=255, anchor='mm',
+                              stroke_width=gr)
+    mask = mask.filter(ImageFilter.GaussianBlur(gr/3))
+    ink  = Image.new('RGBA', mask.size, gcol+(22,))
+    img.paste(Image.composite(ink, img.crop(box), mask), box[:2])
+    draw.text(pos, text, font=font, fill=fill, anchor='mm',
+             stroke_width=6, stroke_fill=(0,0,0,230))
+
+def thumb_text():
+    """The text every thumbnail shares: badge, headline panel, CTA."""
     txt = Image.new('RGBA', (W,H), (0,0,0,0))
     dt  = ImageDraw.Draw(txt)
+    F   = {k: load_font(sz) for k, sz in THUMB_FONTS.items()}
 
-    F_BADGE = load_font(52); F_DYK1  = load_font(128)
-    F_DYK2  = load_font(172); F_SUB  = load_font(62)
-    F_SMALL = load_font(44); F_FACT  = load_font(42)
-
-    def glow_text(draw, pos, text, font, fill, gcol, gr=28):
-        for ox,oy,a in [(5,8,140),(3,5,100),(1,3,60)]:
-            draw.text((pos[0]+ox,pos[1]+oy), text, font=font,
-                     fill=(0,0,0,a), anchor='mm',
-                     stroke_width=5, stroke_fill=(0,0,0,a))
-        for r in [gr, gr*2//3, gr//3]:
-            for dx in range(-r, r+1, max(1,r//3)):
-                for dy in range(-r, r+1, max(1,r//3)):
-                    if abs(dx)+abs(dy) > r*1.4: continue
-                    draw.text((pos[0]+dx,pos[1]+dy), text,
-                             font=font, fill=gcol+(22,), anchor='mm')
-        draw.text(pos, text, font=font, fill=fill, anchor='mm',
-                 stroke_width=6, stroke_fill=(0,0,0,230))
-
-    btxt = '🧠  RANDOM FACTS'
-    bw   = textw(F_BADGE, btxt)+60; bh=80
+    btxt = THUMB_BADGE
+    bw   = textw(F['badge'], btxt)+60; bh=80
     bx   = W//2-bw//2; by=115
     dt.rounded_rectangle([bx,by,bx+bw,by+bh], radius=40,
                         fill=(255,220,0,235))
     dt.rounded_rectangle([bx,by,bx+bw,by+bh], radius=40,
                         outline=(255,255,255,120), width=2)
-    dt.text((W//2,by+bh//2), btxt, font=F_BADGE,
+    dt.text((W//2,by+bh//2), btxt, font=F['badge'],
            fill=(10,10,30,255), anchor='mm')
 
     CY  = H//2-80; pt1=CY-230; pt2=CY+230
@@ -659,22 +1024,107 @@ def generate_thumbnail(facts, ipaths, out_dir):
     dt.rounded_rectangle([60,pt1,W-60,pt2], radius=36,
                         outline=(255,220,0,100), width=3)
 
-    glow_text(dt,(W//2,CY-110),'DID  YOU', F_DYK1,
+    glow_text(txt,dt,(W//2,CY-110),THUMB_HEADLINE[0], F['dyk1'],
               (255,255,255,255),(120,180,255),gr=20)
-    glow_text(dt,(W//2,CY+80),'KNOW?', F_DYK2,
+    glow_text(txt,dt,(W//2,CY+80),THUMB_HEADLINE[1], F['dyk2'],
               (255,225,0,255),(255,190,0),gr=35)
 
     for lw_,lop in [(8,200),(4,110),(2,55)]:
         dt.line([W//2-340,CY+195,W//2+340,CY+195],
                fill=(255,220,0,lop), width=lw_)
 
-    glow_text(dt,(W//2,CY+290),
+    cta_y = H-175
+    dt.text((W//2,cta_y-28), THUMB_CTA[0], font=F['sub'],
+           fill=(255,220,0,235), anchor='mm',
+           stroke_width=3, stroke_fill=(0,0,0,210))
+    dt.text((W//2,cta_y+52), THUMB_CTA[1], font=F['small'],
+           fill=(255,255,255,180), anchor='mm',
+           stroke_width=1, stroke_fill=(0,0,0,160))
+    return txt
+
+@functools.lru_cache(maxsize=None)
+def font_digest(sz):
+    """Hash of the font file load_font(sz) uses, so swapping it shows."""
+    path = getattr(load_font(sz), 'path', None)
+    if not path:
+        return 'default'
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def template_key():
+    spec = {'v': THUMB_TEMPLATE_V, 'size': [W, H], 'badge': THUMB_BADGE,
+            'headline': THUMB_HEADLINE, 'cta': THUMB_CTA,
+            'fonts': {k: [sz, font_digest(sz)]
+                      for k, sz in THUMB_FONTS.items()}}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True)
+                          .encode()).hexdigest()[:16]
+
+_template_lock = threading.Lock()
+
+def thumb_template():
+    """
+    The backdrop with the shared text on top, as one RGBA image: read
+    from THUMB_CACHE_DIR when a template with the same key was built
+    before, else built and stored there. Kept in memory for the
+    process (thread-safe, so batch mode builds it once).
+    """
+    with _template_lock:
+        return _thumb_template(template_key())
+
+@functools.lru_cache(maxsize=1)
+def _thumb_template(key):
+    path = os.path.join(THUMB_CACHE_DIR, f'template-{key}.png')
+    try:
+        img = Image.open(path)
+        img.load()
+        return img.convert('RGBA')
+    except (OSError, ValueError):
+        pass
+    img = Image.alpha_composite(thumb_backdrop(), thumb_text())
+    os.makedirs(THUMB_CACHE_DIR, exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    img.save(tmp, format='PNG', compress_level=6)
+    os.replace(tmp, path)
+    log.info(f'🖼️  Thumbnail template → {path}')
+    return img
+
+def generate_thumbnail(facts, ipaths, out_dir):
+    bg_files = sorted(glob.glob(f'{out_dir}/images/bg*.jpg'))
+    if not bg_files:
+        bg_img = vgradient((10,0,80), (70,0,200))
+    else:
+        best, bsc = bg_files[0], 0
+        for p in bg_files[:6]:
+            try:
+                sm  = np.array(Image.open(p).resize((40,40)))
+                sat = np.std(sm.reshape(-1,3), axis=0).mean()
+                if sat > bsc: bsc = sat; best = p
+            except: pass
+        bg_img = Image.open(best).convert('RGB').resize(
+            (W,H), Image.LANCZOS)
+
+    bg_img = ImageEnhance.Color(bg_img).enhance(1.6)
+    bg_img = ImageEnhance.Contrast(bg_img).enhance(1.2)
+    bg_img = ImageEnhance.Brightness(bg_img).enhance(0.55)
+    bg_img = bg_img.filter(ImageFilter.GaussianBlur(2))
+    bg_rgba = Image.alpha_composite(bg_img.convert('RGBA'),
+                                    thumb_template())
+
+    # Only the fact count and the fact #1 preview differ per video
+    txt = Image.new('RGBA', (W,H), (0,0,0,0))
+    dt  = ImageDraw.Draw(txt)
+    F_SUB   = load_font(THUMB_FONTS['sub'])
+    F_SMALL = load_font(THUMB_FONTS['small'])
+    F_FACT  = load_font(THUMB_FONTS['fact'])
+
+    CY = H//2-80
+    glow_text(txt,dt,(W//2,CY+290),
               f'🔥  {len(facts)} Mind-Blowing Facts  🔥',
               F_SUB,(255,255,255,245),(180,220,255),gr=14)
 
     if facts:
         prev  = facts[0][:60]+('...' if len(facts[0])>60 else '')
-        lines = tw2.wrap(prev, width=32)[:2]
+        lines = textwrap.wrap(prev, width=32)[:2]
         pw    = W-120; ph=len(lines)*64+38; px1=60; py1=H-380-ph
         dt.rounded_rectangle([px1,py1,px1+pw,py1+ph],
                             radius=22, fill=(10,10,40,190))
@@ -689,14 +1139,6 @@ def generate_thumbnail(facts, ipaths, out_dir):
                    fill=(255,255,255,230), anchor='mm',
                    stroke_width=1, stroke_fill=(0,0,0,160))
 
-    cta_y = H-175
-    dt.text((W//2,cta_y-28), '▶  WATCH NOW', font=F_SUB,
-           fill=(255,220,0,235), anchor='mm',
-           stroke_width=3, stroke_fill=(0,0,0,210))
-    dt.text((W//2,cta_y+52), '👇  Swipe Up  👇', font=F_SMALL,
-           fill=(255,255,255,180), anchor='mm',
-           stroke_width=1, stroke_fill=(0,0,0,160))
-
     thumb = Image.alpha_composite(bg_rgba, txt).convert('RGB')
     thumb = thumb.filter(
         ImageFilter.UnsharpMask(radius=1.2, percent=140,
@@ -709,21 +1151,177 @@ def generate_thumbnail(facts, ipaths, out_dir):
     return thumb_path
 
 # ── 9. Main entry point ───────────────────────────────────────────
-def generate(video_number=1):
-    out_dir = f'output/video_{video_number}'
-    os.makedirs(out_dir, exist_ok=True)
-
-    facts, apaths, durs, wtimes, fstarts, total = \
-        fetch_and_generate(out_dir)
+# Background download only needs a rough length: facts fill 50–60s and
+# the hook adds HOOK_DUR, so size it for the longest video.
+EST_TOTAL = 60 + HOOK_DUR
 
+def write_facts(facts, out_dir):
     with open(f'{out_dir}/facts.json', 'w') as f:
         json.dump(facts, f, indent=2)
 
-    mix_path   = mix_audio(apaths, fstarts, total, out_dir)
-    ipaths, dc = download_backgrounds(total, out_dir)
-    bg_path    = build_background(ipaths, dc, total, out_dir)
-    vid_path   = render_video(facts, durs, wtimes, fstarts,
-                              total, bg_path, mix_path, out_dir)
-    thumb_path = generate_thumbnail(facts, ipaths, out_dir)
+# generate()'s stages, in the order they can start; --from-stage takes one
+STAGES = ('fetch', 'facts_json', 'mix', 'images', 'thumbnail',
+          'background', 'render')
 
-    return vid_path, thumb_path, facts
+def saved_file(path):
+    """Checkpoint entry of a stage whose result is the file it wrote."""
+    return path, [path]
+
+def saved_fetch(res, out_dir):
+    """fetch's result with its clips swapped for the WAVs it wrote."""
+    facts, _, durs, wtimes, fstarts, total = res
+    wavs = [f'{out_dir}/audio/f{i}.wav' for i in range(len(facts))]
+    return [facts, wavs, durs, wtimes, fstarts, total], wavs
+
+# Videos generate_batch() makes at once; each still renders with
+# RENDER_WORKERS processes, shared by the whole batch.
+BATCH_WORKERS = int(os.environ.get('SHORTS_BATCH_WORKERS', 2))
+
+class Shared:
+    """
+    Warm state every video made in this process reuses: the used-facts
+    store, image pool, TTS cache, one HTTP session and the worker
+    process pools (which keep their imports, fonts and SFX loaded).
+    """
+    def __init__(self, videos=1):
+        self.used    = UsedFacts()
+        self.images  = ImagePool()
+        self.tts     = TTSCache()
+        self.session = http_session(videos*(FETCH_WORKERS+DL_WORKERS))
+        self.procs   = process_pool(2)
+        self.lock    = threading.Lock()
+        self._render = None
+
+    def render_pool(self):
+        """Pool for parallel rendering, started on first use."""
+        if RENDER_WORKERS <= 1:
+            return None
+        with self.lock:
+            if self._render is None:
+                self._render = render_pool(RENDER_WORKERS)
+            return self._render
+
+    def close(self):
+        self.procs.shutdown()
+        if self._render:
+            self._render.close()
+            self._render.join()
+        self.session.close()
+
+def generate(video_number=1, shared=None, from_stage=None):
+    """
+    Runs the stages as a dependency graph so independent ones overlap:
+    backgrounds download while facts are fetched, audio mixing runs
+    alongside the background build, and the thumbnail alongside the
+    render. `shared` is the batch's warm state (see generate_batch).
+
+    Finished stages are checkpointed in out_dir/manifest.json, so
+    calling this again for the same video after a failure resumes
+    after the last stage that completed. `from_stage` forces that
+    stage and every one after it in STAGES to run again.
+    """
+    out_dir = f'output/video_{video_number}'
+    os.makedirs(f'{out_dir}/images', exist_ok=True)
+    own = shared is None
+    sh  = shared or Shared()
+    # Everything that changes a stage's output besides its inputs
+    ckpt = Checkpoint(out_dir,
+                      rerun=STAGES[STAGES.index(from_stage):]
+                            if from_stage else (),
+                      config={'size': [W, H], 'fps': FPS,
+                              'encoder': ENCODER, 'x264': X264,
+                              'single_pass': SINGLE_PASS,
+                              'frame_memo': FRAME_MEMO and MOTION_FPS})
+
+    # fetch → (facts, clips, durs, wtimes, fstarts, total)
+    fetch = lambda r, i: r['fetch'][i]
+    stages = [
+        Stage('fetch',      [], fetch_and_generate,
+              lambda r: (out_dir, FACTS_URL, gtts_save, FETCH_WORKERS,
+                         'gtts', sh.tts, sh.used, sh.session),
+              save=lambda res: saved_fetch(res, out_dir)),
+        Stage('facts_json', ['fetch'], write_facts,
+              lambda r: (fetch(r, 0), out_dir),
+              save=lambda res: (None, [f'{out_dir}/facts.json'])),
+        Stage('mix',        ['fetch'], mix_audio,
+              lambda r: (fetch(r, 1), fetch(r, 4), fetch(r, 5),
+                         out_dir), save=saved_file),
+        Stage('images',     [], download_backgrounds,
+              lambda r: (EST_TOTAL, out_dir, sh.images, sh.session),
+              save=lambda res: (res, res[0])),
+        Stage('thumbnail',  ['fetch', 'images'], generate_thumbnail,
+              lambda r: (fetch(r, 0), r['images'][0], out_dir),
+              proc=True, save=saved_file),
+    ]
+    if SINGLE_PASS:
+        stages.append(Stage('background', ['images'], tuple,
+                            lambda r: (r['images'],),
+                            save=lambda res: (res, [])))
+    else:
+        stages.append(Stage('background', ['fetch', 'images'],
+                            build_background,
+                            lambda r: (*r['images'], fetch(r, 5),
+                                       out_dir),
+                            proc=True, save=saved_file))
+    stages.append(Stage(
+        'render', ['fetch', 'mix', 'background'], render_video,
+        lambda r: (fetch(r, 0), fetch(r, 2), fetch(r, 3), fetch(r, 4),
+                   fetch(r, 5), r['background'], r['mix'], out_dir,
+                   RENDER_WORKERS, sh.render_pool()),
+        save=saved_file))
+
+    try:
+        r = run_graph(stages, report=report_for(out_dir),
+                      profile_dir=PROFILE and f'{out_dir}/profile',
+                      ppool=sh.procs, checkpoint=ckpt)
+    finally:
+        log.info(f'⏱️  Timings: {write_report(out_dir)}')
+        if own:
+            sh.close()
+    return r['render'], r['thumbnail'], r['fetch'][0]
+
+def generate_batch(video_numbers, workers=BATCH_WORKERS, from_stage=None):
+    """
+    Makes every video in one process, `workers` at a time, sharing one
+    warm Shared state; facts are unique across the whole batch. A
+    failed video is logged and doesn't stop the others. Returns
+    [(video_number, generate() result or None)] in input order.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    video_numbers = list(video_numbers)
+    sh = Shared(min(workers, len(video_numbers)) or 1)
+
+    def one(n):
+        try:
+            return generate(n, sh, from_stage)
+        except Exception:
+            log.exception(f'❌ Video {n} failed')
+            return None
+
+    try:
+        with ThreadPoolExecutor(max(1, workers)) as ex:
+            res = list(ex.map(one, video_numbers))
+    finally:
+        sh.close()
+    log.info(f'✅ Batch: {sum(r is not None for r in res)}/'
+             f'{len(res)} videos')
+    return list(zip(video_numbers, res))
+
+if __name__ == '__main__':
+    # python -m scripts.generate_short [first_number] [--batch K]
+    #                                  [--from-stage STAGE]
+    import argparse
+    ap = argparse.ArgumentParser(description='Generate Shorts')
+    ap.add_argument('video_number', type=int, nargs='?', default=1)
+    ap.add_argument('--batch', type=int, default=1,
+                    help='videos to make, numbered from video_number')
+    ap.add_argument('--workers', type=int, default=BATCH_WORKERS)
+    ap.add_argument('--from-stage', choices=STAGES,
+                    help='re-run this stage and every later one '
+                         '(in the order listed), even if checkpointed')
+    a  = ap.parse_args()
+    ns = range(a.video_number, a.video_number+a.batch)
+    for n, res in generate_batch(ns, a.workers, a.from_stage):
+        print(json.dumps({'video_number': n,
+                          'video': res and res[0],
+                          'thumbnail': res and res[1]}))
@@ -0,0 +1,244 @@
+# ================================================================
+# 🖼️ Image pool — concurrent Unsplash downloads + reusable backgrounds
+# ================================================================
+import os, io, json, math, time, random, logging, threading
+import numpy as np
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageFilter
+
+log = logging.getLogger(__name__)
+
+IMAGE_POOL_DIR = os.environ.get('SHORTS_IMAGE_POOL', '.cache/images')
+POOL_MAX       = int(os.environ.get('SHORTS_IMAGE_POOL_MAX', 150))
+# New images fetched per run even when the pool could cover it alone,
+# and how long to wait for them in that case before going without.
+TOPUP          = int(os.environ.get('SHORTS_IMAGE_TOPUP', 4))
+TOPUP_WAIT     = float(os.environ.get('SHORTS_IMAGE_TOPUP_WAIT', 8))
+DL_WORKERS     = int(os.environ.get('SHORTS_DL_WORKERS', 6))
+
+UNSPLASH_URL   = 'https://api.unsplash.com/search/photos'
+UNSPLASH_QUERY = 'abstract colorful texture'
+
+def http_session(workers=DL_WORKERS):
+    """requests.Session whose connection pool fits `workers` threads."""
+    s = requests.Session()
+    a = requests.adapters.HTTPAdapter(pool_connections=4,
+                                      pool_maxsize=workers)
+    s.mount('https://', a)
+    s.mount('http://',  a)
+    return s
+
+def prepare_image(data, w, h):
+    """
+    Centre-crops raw image bytes to w:h, resizes to w×h and blurs.
+    Returns (image, dominant colour) — the colour is taken pre-blur.
+    """
+    img = Image.open(io.BytesIO(data)).convert('RGB')
+    rat = w/h
+    if img.width/img.height > rat:
+        nw  = int(img.height*rat)
+        img = img.crop(((img.width-nw)//2, 0,
+                        (img.width+nw)//2, img.height))
+    else:
+        nh  = int(img.width/rat)
+        img = img.crop((0, (img.height-nh)//2,
+                        img.width, (img.height+nh)//2))
+    img = img.resize((w, h), Image.LANCZOS)
+    sm  = np.array(img.resize((50,50))).reshape(-1,3)
+    dc  = tuple(int(x) for x in np.median(sm, axis=0))
+    return img.filter(ImageFilter.GaussianBlur(1.5)), dc
+
+class ImagePool:
+    """
+    Directory of ready-to-use w×h backgrounds plus index.json holding
+    each image's dominant colour and how often it has been used.
+    Safe to top up from several threads while others pick.
+    """
+    def __init__(self, root=IMAGE_POOL_DIR, max_size=POOL_MAX):
+        self.root     = root
+        self.max_size = max_size
+        self.index    = {}
+        self.lock     = threading.Lock()
+        self.picked   = set()
+        self.pending  = set()
+        os.makedirs(root, exist_ok=True)
+        try:
+            with open(self._index_path()) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            pass
+        # Drop entries whose file vanished (partial cache restore)
+        self.index = {k: v for k, v in self.index.items()
+                      if os.path.exists(self.path(k))}
+
+    def _index_path(self):
+        return os.path.join(self.root, 'index.json')
+
+    def path(self, pid):
+        return os.path.join(self.root, f'{pid}.jpg')
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, pid):
+        return pid in self.index
+
+    def reserve(self, pids):
+        """
+        The ids neither pooled nor being downloaded by another top-up,
+        now marked as being downloaded (until add() or unreserve()).
+        """
+        with self.lock:
+            new = [p for p in pids
+                   if p not in self.index and p not in self.pending]
+            self.pending.update(new)
+            return new
+
+    def unreserve(self, pids):
+        with self.lock:
+            self.pending.difference_update(pids)
+
+    def add(self, pid, dcol):
+        """Registers an image already written to path(pid)."""
+        with self.lock:
+            self.pending.discard(pid)
+            self.index[pid] = {'dcol': list(dcol), 'uses': 0,
+                               'added': int(time.time())}
+
+    def pick(self, n, prefer=()):
+        """
+        Chooses up to n images: `prefer` first, then the least used
+        (ties broken randomly). Returns [(path, dcol)].
+        """
+        rnd = random.Random(int(time.time()))
+        with self.lock:
+            rest = [k for k in self.index if k not in prefer]
+            rnd.shuffle(rest)
+            rest.sort(key=lambda k: self.index[k]['uses'])
+            ids  = ([k for k in prefer if k in self.index] + rest)[:n]
+            for k in ids:
+                self.index[k]['uses'] += 1
+            self.picked.update(ids)
+            return [(self.path(k), tuple(self.index[k]['dcol']))
+                    for k in ids]
+
+    def save(self):
+        """
+        Evicts the most used images past max_size (never ones picked by
+        this process, they may still be being copied), writes the index.
+        """
+        with self.lock:
+            if len(self.index) > self.max_size:
+                old = sorted((k for k in self.index
+                              if k not in self.picked),
+                             key=lambda k: (-self.index[k]['uses'],
+                                            self.index[k]['added']))
+                for k in old[:len(self.index)-self.max_size]:
+                    del self.index[k]
+                    try:
+                        os.remove(self.path(k))
+                    except OSError:
+                        pass
+            tmp = self._index_path() + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self.index, f)
+            os.replace(tmp, self._index_path())
+
+def _timed_get(session, net, kind, url, **kw):
+    """session.get() with the body read, reporting its time to net()."""
+    t0 = time.perf_counter()
+    try:
+        r = session.get(url, **kw)
+        r.content
+        return r
+    finally:
+        if net:
+            net(kind, time.perf_counter()-t0)
+
+def search_unsplash(session, key, want, workers=DL_WORKERS,
+                    query=UNSPLASH_QUERY, url=UNSPLASH_URL, net=None):
+    """Fetches enough search pages concurrently for `want` photos."""
+    per   = 30
+    pages = min(7, math.ceil(want/per) + 1)
+
+    def page(pg):
+        try:
+            rs = _timed_get(
+                session, net, 'unsplash_search', url,
+                headers={'Authorization': f'Client-ID {key}'},
+                params={
+                    'query': query,
+                    'orientation': 'portrait',
+                    'per_page': per, 'page': pg,
+                    'content_filter': 'high',
+                }, timeout=10)
+            return rs.json().get('results', [])
+        except Exception as e:
+            log.warning(f'Unsplash: {e}')
+            return []
+
+    with ThreadPoolExecutor(min(workers, pages)) as ex:
+        return [p for res in ex.map(page, range(1, pages+1))
+                for p in res]
+
+def top_up(pool, session, key, want, w, h, workers=DL_WORKERS,
+           net=None):
+    """
+    Downloads and prepares up to `want` photos that aren't pooled yet,
+    concurrently, straight into the pool. Returns the new pool ids.
+    `net(kind, secs)` is told how long each HTTP request took.
+    """
+    if want <= 0:
+        return []
+    found = {p['id']: p for p in search_unsplash(session, key, want,
+                                                 workers, net=net)
+             if p.get('id')}
+    ids   = pool.reserve([i for i in found if i not in pool][:want])
+    found = [found[i] for i in ids]
+
+    def fetch(p):
+        pid = p['id']
+        try:
+            url = (f"{p['urls']['raw']}&w={w}&h={h}"
+                   f"&fit=crop&crop=entropy")
+            img, dc = prepare_image(
+                _timed_get(session, net, 'image_download', url,
+                           timeout=15).content, w, h)
+            img.save(pool.path(pid), quality=92)
+            return pid, dc
+        except Exception as e:
+            log.warning(f'Image {pid}: {e}')
+            return None
+
+    new = []
+    try:
+        if found:
+            with ThreadPoolExecutor(workers) as ex:
+                for res in ex.map(fetch, found):
+                    if res:
+                        pool.add(*res)
+                        new.append(res[0])
+                        log.info(f'  ✅ Image {len(new)}/{len(found)}')
+    finally:
+        pool.unreserve(ids)
+    return new
+
+def start_top_up(pool, key, want, w, h, net=None, session=None):
+    """
+    Runs top_up() + pool.save() on a background thread, with its own
+    session unless one is given. Returns (thread, list the new ids are
+    appended to).
+    """
+    fresh = []
+    def run():
+        if session:
+            fresh.extend(top_up(pool, session, key, want, w, h,
+                                net=net))
+        else:
+            with http_session() as s:
+                fresh.extend(top_up(pool, s, key, want, w, h, net=net))
+        pool.save()
+    job = threading.Thread(target=run, name='image-top-up')
+    job.start()
+    return job, fresh
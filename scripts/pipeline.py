@@ -0,0 +1,167 @@
+# ================================================================
+# 🕸️ Pipeline — tiny dependency-graph executor for generate()
+# ================================================================
+import os, time, logging, cProfile
+from multiprocessing import get_context
+from collections import namedtuple
+from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                wait, FIRST_COMPLETED)
+
+log = logging.getLogger(__name__)
+
+# `args(results)` runs in the scheduling thread and maps the finished
+# dependencies' results to the positional arguments of `fn`. Stages
+# with proc=True run in a worker process, so fn and its arguments must
+# be picklable. `save(result)` returns (JSON-able value, [files written])
+# for the checkpoint; a restored stage's result is that value.
+Stage = namedtuple('Stage', 'name deps fn args proc save',
+                   defaults=(False, None))
+
+def _timed(fn, args, prof_path=None):
+    """
+    Runs fn(*args) in the worker thread/process and measures it there:
+    wall time, that thread's CPU time, and the process's RSS at the end
+    and its growth meanwhile (thread stages share the process, so that
+    includes whatever ran alongside).
+    """
+    from scripts.timing import rss_mb
+    r0     = rss_mb()
+    w0, c0 = time.perf_counter(), time.thread_time()
+    prof   = cProfile.Profile() if prof_path else None
+    if prof:
+        prof.enable()
+    try:
+        res = fn(*args)
+    finally:
+        if prof:
+            prof.disable()
+            prof.dump_stats(prof_path)
+    r1 = rss_mb()
+    return res, {'wall': round(time.perf_counter()-w0, 3),
+                 'cpu':  round(time.thread_time()-c0, 3),
+                 'rss_mb': r1,
+                 'rss_delta_mb': None if r1 is None else round(r1-r0, 1)}
+
+def run_graph(stages, threads=4, procs=2, report=None, profile_dir=None,
+              ppool=None, checkpoint=None):
+    """
+    Runs every stage as soon as its dependencies are done. Returns
+    {name: result}; the first failing stage's exception is re-raised
+    once already-running stages have finished. proc stages run in
+    `ppool` when given (kept open), else in a pool of `procs`.
+
+    Stage timings and the critical path go to `report` (a
+    timing.Report) when given; with `profile_dir` every stage also
+    dumps a cProfile there as <name>.prof.
+
+    With a `checkpoint` (checkpoint.Checkpoint), stages with a `save`
+    whose recorded outputs are still valid are skipped, and every such
+    stage that runs is recorded there once it finishes.
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        for d in s.deps:
+            if d not in by_name:
+                raise ValueError(f'{s.name}: unknown dependency {d}')
+
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+    results, spans, running, keys = {}, {}, {}, {}
+    pending = list(stages)
+    t0      = time.perf_counter()
+    tpool   = ThreadPoolExecutor(threads)
+    own     = ppool is None and any(s.proc for s in stages)
+    if own:
+        ppool = process_pool(procs)
+    try:
+        while pending or running:
+            # Restored stages can make more ready at once: repeat
+            ready = [s for s in pending if all(d in results for d in s.deps)]
+            while ready:
+                s = ready.pop(0)
+                pending.remove(s)
+                if checkpoint and s.save and \
+                        all(d in keys for d in s.deps):
+                    keys[s.name] = checkpoint.key(s.name, s.deps)
+                    ok, res = checkpoint.restore(s.name, keys[s.name])
+                    if ok:
+                        results[s.name] = res
+                        now = time.perf_counter()-t0
+                        spans[s.name] = [now, now]
+                        log.info(f'⏭️  [{now:6.1f}s] {s.name} '
+                                 f'(checkpoint)')
+                        if report:
+                            report.add_stage(s.name, {'restored': True})
+                        ready += [p for p in pending if p not in ready and
+                                  all(d in results for d in p.deps)]
+                        continue
+                    checkpoint.forget(s.name)
+                pool = ppool if s.proc else tpool
+                prof = profile_dir and f'{profile_dir}/{s.name}.prof'
+                fut  = pool.submit(_timed, s.fn, s.args(results), prof)
+                running[fut]  = s
+                spans[s.name] = [time.perf_counter()-t0, None]
+                log.info(f'▶️  [{spans[s.name][0]:6.1f}s] {s.name}')
+            if not running and not pending:
+                break
+            if not running:
+                raise RuntimeError(
+                    'Dependency cycle: ' + ', '.join(s.name for s in pending))
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                s = running.pop(fut)
+                spans[s.name][1] = time.perf_counter()-t0
+                try:
+                    results[s.name], stats = fut.result()
+                except Exception:
+                    log.error(f'❌ Stage {s.name} failed')
+                    pending.clear()
+                    wait(running)
+                    # Still checkpoint whatever else finished
+                    for f, o in running.items():
+                        if o.name in keys and not f.exception():
+                            checkpoint.record(o.name, keys[o.name],
+                                              *o.save(f.result()[0]))
+                    raise
+                if report:
+                    report.add_stage(s.name, {
+                        'start': round(spans[s.name][0], 3),
+                        'end':   round(spans[s.name][1], 3), **stats})
+                if s.name in keys:
+                    checkpoint.record(s.name, keys[s.name],
+                                      *s.save(results[s.name]))
+    finally:
+        tpool.shutdown()
+        if own:
+            ppool.shutdown()
+
+    path = log_timeline(by_name, spans)
+    if report:
+        report.path = path
+    return results
+
+def process_pool(procs=2):
+    # spawn, not fork: other stages' threads are running by then
+    return ProcessPoolExecutor(procs, mp_context=get_context('spawn'))
+
+def critical_path(by_name, spans):
+    """Walks back from the last stage to finish via its latest dependency."""
+    name = max(spans, key=lambda n: spans[n][1])
+    path = [name]
+    while by_name[name].deps:
+        name = max(by_name[name].deps, key=lambda n: spans[n][1])
+        path.append(name)
+    return path[::-1]
+
+def log_timeline(by_name, spans):
+    end   = max(e for _, e in spans.values()) or 1e-9
+    width = 40
+    log.info('🕒 Stage timeline:')
+    for name, (s, e) in sorted(spans.items(), key=lambda kv: kv[1][0]):
+        a, b = int(s/end*width), max(int(e/end*width), int(s/end*width)+1)
+        log.info(f'  {name:<12} {" "*a}{"█"*(b-a):<{width-a}} '
+                 f'{s:6.1f}s → {e:6.1f}s ({e-s:.1f}s)')
+    path = critical_path(by_name, spans)
+    log.info(f'  critical path: {" → ".join(path)} ({end:.1f}s)')
+    return path
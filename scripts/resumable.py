@@ -0,0 +1,156 @@
+# ================================================================
+# ⏫ Resumable upload — restartable across retries and processes
+# ================================================================
+import os, json, time, logging
+
+log = logging.getLogger(__name__)
+
+UPLOAD_URL = 'https://www.googleapis.com/upload/youtube/v3/videos'
+# The protocol wants every chunk but the last to be a multiple of this
+CHUNK_UNIT = 256 * 1024
+CHUNK_MIN  = int(os.environ.get('SHORTS_UPLOAD_CHUNK_MIN', 1024*1024))
+CHUNK_MAX  = int(os.environ.get('SHORTS_UPLOAD_CHUNK_MAX', 64*1024*1024))
+# Chunks are sized to take about this long at the measured throughput
+CHUNK_SECS = float(os.environ.get('SHORTS_UPLOAD_CHUNK_SECS', 8))
+
+class SessionExpired(Exception):
+    """The upload session is gone (404/410): start a new one."""
+
+def next_chunk(chunk, sent, secs):
+    """
+    Chunk size for CHUNK_SECS at the throughput just measured, changed
+    by at most 2× per step and kept a multiple of CHUNK_UNIT.
+    """
+    want = sent/max(secs, 1e-3) * CHUNK_SECS
+    want = min(max(want, chunk/2), chunk*2, CHUNK_MAX)
+    return max(CHUNK_UNIT, int(want)//CHUNK_UNIT*CHUNK_UNIT)
+
+class ResumableUpload:
+    """
+    Uploads one file with the resumable upload protocol: a POST opens
+    a session, chunks are PUT with Content-Range, and the server's
+    308 + Range says how much it has. `session` is a requests.Session
+    that authenticates (google.auth AuthorizedSession); `url` can point
+    at a local fake of the protocol.
+
+    The session URI, acknowledged offset and chunk size are written to
+    `state_path` after every chunk, so a retry, in this process or a
+    new one, asks the server for its offset and carries on from there.
+    """
+    def __init__(self, session, path, metadata, state_path,
+                 mimetype='video/mp4', url=UPLOAD_URL, params=None):
+        self.session    = session
+        self.path       = path
+        self.metadata   = metadata
+        self.state_path = state_path
+        self.mimetype   = mimetype
+        self.url        = url
+        self.params     = params or {}
+        self.size       = os.path.getsize(path)
+        self.uri, self.offset, self.chunk = None, 0, CHUNK_MIN
+        self.response   = None
+        self._load()
+
+    # ── State on disk ────────────────────────────────────────────
+    def _file_id(self):
+        st = os.stat(self.path)
+        return [os.path.abspath(self.path), st.st_size, st.st_mtime_ns]
+
+    def _load(self):
+        try:
+            with open(self.state_path) as f:
+                st = json.load(f)
+        except (OSError, ValueError):
+            return
+        if st.get('file') == self._file_id():
+            self.uri   = st['uri']
+            self.chunk = st.get('chunk', CHUNK_MIN)
+            log.info(f'  ⏯️  Resuming upload session '
+                     f'({st.get("offset", 0)//1024}KB sent before)')
+
+    def _save(self):
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'file': self._file_id(), 'uri': self.uri,
+                       'offset': self.offset, 'chunk': self.chunk}, f)
+        os.replace(tmp, self.state_path)
+
+    def _clear(self):
+        self.uri, self.offset = None, 0
+        try:
+            os.remove(self.state_path)
+        except OSError:
+            pass
+
+    # ── Protocol ─────────────────────────────────────────────────
+    def _start(self):
+        r = self.session.post(
+            self.url, params={'uploadType': 'resumable', **self.params},
+            json=self.metadata, timeout=30,
+            headers={'X-Upload-Content-Type':   self.mimetype,
+                     'X-Upload-Content-Length': str(self.size)})
+        r.raise_for_status()
+        self.uri, self.offset = r.headers['Location'], 0
+        self._save()
+
+    def _handle(self, r):
+        """Applies a PUT's reply: done, new offset, or an error."""
+        if r.status_code in (200, 201):
+            self.response = r.json()
+        elif r.status_code == 308:
+            rng = r.headers.get('Range')        # 'bytes=0-N'
+            self.offset = int(rng.rsplit('-', 1)[1])+1 if rng else 0
+        elif r.status_code in (404, 410):
+            raise SessionExpired(f'upload session {r.status_code}')
+        else:
+            r.raise_for_status()
+            raise RuntimeError(f'unexpected upload reply {r.status_code}')
+
+    def _query(self):
+        """Asks the server how much of the file it has."""
+        self._handle(self.session.put(
+            self.uri, timeout=30,
+            headers={'Content-Range': f'bytes */{self.size}',
+                     'Content-Length': '0'}))
+
+    def _send(self):
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(self.chunk)
+        end = self.offset + len(data) - 1
+        t0  = time.perf_counter()
+        try:
+            self._handle(self.session.put(
+                self.uri, data=data, timeout=(30, 60 + 4*CHUNK_SECS),
+                headers={'Content-Range':
+                         f'bytes {self.offset}-{end}/{self.size}'}))
+        except Exception:
+            self.chunk = max(CHUNK_UNIT, self.chunk//2//CHUNK_UNIT
+                             * CHUNK_UNIT)
+            raise
+        self.chunk = next_chunk(self.chunk, len(data),
+                                time.perf_counter()-t0)
+
+    def run(self, progress=None):
+        """
+        Uploads whatever the server doesn't have yet and returns its
+        final JSON reply. Raises on failure with the state kept, so
+        calling run() again resumes; `progress(fraction)` is called
+        after every chunk.
+        """
+        try:
+            if self.uri:
+                self._query()
+            else:
+                self._start()
+            while self.response is None:
+                self._send()
+                self._save()
+                if progress:
+                    progress(self.offset/self.size)
+        except SessionExpired:
+            log.warning('  ⚠️  Upload session expired — starting over')
+            self._clear()
+            raise
+        self._clear()
+        return self.response
@@ -0,0 +1,129 @@
+# ================================================================
+# ⏱️ Timing — per-stage, per-frame and network timings → timings.json
+# ================================================================
+import os, json, time, threading
+from collections import defaultdict
+
+# SHORTS_PROFILE=1 also dumps a cProfile per stage to out_dir/profile/
+PROFILE = os.environ.get('SHORTS_PROFILE', '') not in ('', '0')
+
+HIST_BINS_MS = [10, 25, 50, 75, 100, 150, 200, 300, 500, 1000]
+
+def peak_rss_mb():
+    """This process's high-water mark so far, not any one stage's."""
+    try:
+        import resource
+    except ImportError:     # not on Windows
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(kb/1024, 1)
+
+def rss_mb():
+    """This process's resident set right now (Linux only, else None)."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages*os.sysconf('SC_PAGE_SIZE')/2**20, 1)
+
+class FrameStats:
+    """
+    Per-frame render time plus time spent in each draw helper. Call
+    start() before a frame, lap(name) after each step, end() after the
+    frame. Picklable, so pool workers can send theirs back to merge().
+    """
+    def __init__(self):
+        self.frames  = []
+        self.helpers = defaultdict(float)
+        self._t0 = self._t = 0.0
+
+    def start(self):
+        self._t0 = self._t = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.helpers[name] += now - self._t
+        self._t = now
+
+    def end(self):
+        self.frames.append(time.perf_counter() - self._t0)
+
+    def merge(self, other):
+        self.frames.extend(other.frames)
+        for k, v in other.helpers.items():
+            self.helpers[k] += v
+
+    def summary(self):
+        if not self.frames:
+            return {'count': 0}
+        ms   = sorted(f*1000 for f in self.frames)
+        n    = len(ms)
+        hist, lo = {}, 0
+        for hi in HIST_BINS_MS + [None]:
+            key = f'{lo}-{hi}' if hi else f'{lo}+'
+            hist[key] = sum(1 for m in ms
+                            if m >= lo and (hi is None or m < hi))
+            lo = hi
+        return {
+            'count':   n,
+            'mean_ms': round(sum(ms)/n, 2),
+            'p50_ms':  round(ms[n//2], 2),
+            'p95_ms':  round(ms[min(n-1, int(n*0.95))], 2),
+            'max_ms':  round(ms[-1], 2),
+            'histogram_ms': hist,
+            'helpers_ms_per_frame': {
+                k: round(v*1000/n, 2)
+                for k, v in sorted(self.helpers.items(),
+                                   key=lambda kv: -kv[1])},
+        }
+
+class Report:
+    """Everything one video's timings.json holds. Thread-safe."""
+    def __init__(self):
+        self.lock   = threading.Lock()
+        self.stages = {}
+        self.path   = []
+        self.net    = defaultdict(lambda: {'requests': 0, 'seconds': 0.0})
+        self.frames = FrameStats()
+
+    def add_stage(self, name, stats):
+        with self.lock:
+            self.stages[name] = stats
+
+    def add_net(self, kind, secs):
+        with self.lock:
+            self.net[kind]['requests'] += 1
+            self.net[kind]['seconds']  += secs
+
+    def add_frames(self, stats):
+        with self.lock:
+            self.frames.merge(stats)
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'stages': self.stages,
+                'critical_path': self.path,
+                'frames': self.frames.summary(),
+                'network': {k: {'requests': v['requests'],
+                                'seconds': round(v['seconds'], 3)}
+                            for k, v in self.net.items()},
+                'process_peak_rss_mb': peak_rss_mb(),
+            }
+
+_reports, _lock = {}, threading.Lock()
+
+def report_for(out_dir):
+    """The Report collecting timings for the video in `out_dir`."""
+    with _lock:
+        return _reports.setdefault(os.path.normpath(out_dir), Report())
+
+def write_report(out_dir):
+    """Writes out_dir/timings.json and forgets the report."""
+    with _lock:
+        rep = _reports.pop(os.path.normpath(out_dir), None) or Report()
+    path = f'{out_dir}/timings.json'
+    with open(path, 'w') as f:
+        json.dump(rep.to_dict(), f, indent=2)
+    return path
@@ -0,0 +1,72 @@
+# ================================================================
+# 🗣️ TTS cache — content-addressed, size-bounded, LRU-evicted
+# ================================================================
+import os, hashlib, unicodedata, logging, threading
+
+log = logging.getLogger(__name__)
+
+TTS_CACHE_DIR = os.environ.get('SHORTS_TTS_CACHE', '.cache/tts')
+TTS_CACHE_MB  = int(os.environ.get('SHORTS_TTS_CACHE_MB', 300))
+
+def cache_key(text, lang='en', engine='gtts'):
+    """Hash of the normalised text, language and TTS engine."""
+    norm = ' '.join(unicodedata.normalize('NFC', text).split())
+    return hashlib.sha256(
+        f'{engine}\0{lang}\0{norm}'.encode()).hexdigest()
+
+_evict_lock = threading.Lock()
+
+class TTSCache:
+    """
+    Finished (faded + padded) speech segments stored as WAV, one file
+    per key. A file's mtime is its last use; once the directory grows
+    past `max_mb` the least recently used files are evicted.
+    """
+    def __init__(self, root=TTS_CACHE_DIR, max_mb=TTS_CACHE_MB):
+        self.root      = root
+        self.max_bytes = max_mb * 1024 * 1024
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, f'{key}.wav')
+
+    def get(self, key):
+        p = self.path(key)
+        try:
+            os.utime(p)
+        except OSError:
+            return None
+        return p
+
+    def put(self, key, seg):
+        """Stores an AudioSegment under `key` and returns its path."""
+        p   = self.path(key)
+        tmp = f'{p}.{os.getpid()}.tmp'
+        seg.export(tmp, format='wav')
+        os.replace(tmp, p)
+        self.evict()
+        return p
+
+    def evict(self):
+        """One thread at a time: TTS workers all put() concurrently."""
+        with _evict_lock:
+            self._evict()
+
+    def _evict(self):
+        files = []
+        for e in os.scandir(self.root):
+            if e.name.endswith('.wav'):
+                try:
+                    st = e.stat()
+                except OSError:         # removed since the scandir
+                    continue
+                files.append((st.st_mtime, st.st_size, e.path))
+        size = sum(f[1] for f in files)
+        for _, sz, p in sorted(files):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(p)
+                size -= sz
+            except OSError:
+                pass
@@ -1,12 +1,15 @@
 # ================================================================
 # 📤 YouTube Uploader — Thumbnail + Auto Pin + Auto Playlist
 # ================================================================
-import os, time, random, logging
+import os, time, random, logging, threading
+import httplib2, requests
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
+from google.auth.transport.requests import Request, AuthorizedSession
+from google_auth_httplib2 import AuthorizedHttp
 from scripts.metadata_generator import generate_metadata
+from scripts.resumable import ResumableUpload
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
 log = logging.getLogger(__name__)
@@ -22,18 +25,58 @@ PLAYLIST_DESC = (
     'Subscribe and hit the bell so you never miss a fact!'
 )
 
+# Kept next to the video while its upload is in progress
+UPLOAD_STATE = 'upload_session.json'
+
+# ── Shared client ────────────────────────────────────────────────
+# One set of credentials, one upload session and one API client per
+# process. google-auth counts a token as expired a few minutes before
+# it really is, and both transports refresh it then (and on a 401), so
+# the OAuth endpoint is hit about once an hour, not once per call.
+_lock    = threading.Lock()
+_shared  = {}
+
+def _token_request():
+    """Transport for token refreshes: one keep-alive session (_lock held)."""
+    if 'auth' not in _shared:
+        _shared['auth'] = Request(requests.Session())
+    return _shared['auth']
+
+def get_credentials():
+    with _lock:
+        creds = _shared.get('creds')
+        if creds is None:
+            creds = _shared['creds'] = Credentials(
+                token=None,
+                refresh_token=os.environ['YT_REFRESH_TOKEN'],
+                token_uri='https://oauth2.googleapis.com/token',
+                client_id=os.environ['YT_CLIENT_ID'],
+                client_secret=os.environ['YT_CLIENT_SECRET'],
+                scopes=SCOPES,
+            )
+        if not creds.valid:
+            creds.refresh(_token_request())
+            log.info('🔑 YouTube token refreshed')
+        return creds
+
+def get_session():
+    """requests session that adds (and refreshes) the OAuth token."""
+    creds = get_credentials()
+    with _lock:
+        if 'session' not in _shared:
+            _shared['session'] = AuthorizedSession(
+                creds, auth_request=_token_request())
+        return _shared['session']
+
 def get_youtube_client():
-    creds = Credentials(
-        token=None,
-        refresh_token=os.environ['YT_REFRESH_TOKEN'],
-        token_uri='https://oauth2.googleapis.com/token',
-        client_id=os.environ['YT_CLIENT_ID'],
-        client_secret=os.environ['YT_CLIENT_SECRET'],
-        scopes=SCOPES,
-    )
-    creds.refresh(Request())
-    return build('youtube', 'v3', credentials=creds,
-                 cache_discovery=False)
+    """The shared API client: built once, keeps its connection open."""
+    creds = get_credentials()
+    with _lock:
+        if 'yt' not in _shared:
+            _shared['yt'] = build(
+                'youtube', 'v3', cache_discovery=False,
+                http=AuthorizedHttp(creds, http=httplib2.Http(timeout=60)))
+        return _shared['yt']
 
 # ── Thumbnail with retry ──────────────────────────────────────────
 def set_thumbnail(video_id, thumb_path, max_retries=6):
@@ -263,27 +306,23 @@ def upload_video(video_path, facts, video_number,
         },
     }
 
-    media = MediaFileUpload(
-        video_path,
-        mimetype='video/mp4',
-        resumable=True,
-        chunksize=512 * 1024,
-    )
+    # A failed attempt (or process) leaves the session in UPLOAD_STATE;
+    # the next one carries on from the last chunk the server has.
+    upload = None
 
     for attempt in range(1, max_retries + 1):
         try:
-            yt       = get_youtube_client()
-            req      = yt.videos().insert(
-                part='snippet,status',
-                body=body,
-                media_body=media,
-            )
-            response = None
-            while response is None:
-                status, response = req.next_chunk()
-                if status:
-                    pct = int(status.progress() * 100)
-                    print(f'  ⬆️  Uploading... {pct}%', end='\r')
+            # Inside the retry: the first token refresh can fail too
+            if upload is None:
+                upload = ResumableUpload(
+                    get_session(), video_path, body,
+                    state_path=os.path.join(
+                        os.path.dirname(os.path.abspath(video_path)),
+                        UPLOAD_STATE),
+                    params={'part': 'snippet,status'},
+                )
+            response = upload.run(lambda done: print(
+                f'  ⬆️  Uploading... {int(done * 100)}%', end='\r'))
 
             vid_id = response['id']
             url    = f'https://www.youtube.com/shorts/{vid_id}'